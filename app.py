@@ -1,27 +1,44 @@
 import datetime
-from flask import Flask, request, send_from_directory, jsonify, send_file
-from flask_socketio import SocketIO
+from flask import Flask, request, send_from_directory, jsonify, send_file, abort
+from flask_socketio import SocketIO, join_room, leave_room
 import threading, time
 import RPi.GPIO as GPIO
 import serial
-import struct
-import math
 import json
 import io
-
+import os
+import platform
+from force_history import ForceHistory, encode_window
+import telemetry
+import assets
+import sensor_capture
+import sensors
+import jog
+import repeat_stats
+import run_catalog
+import run_data
 
 
 # === Global State ===
 stop_threads = False
-latest_force = {"Fx": 0.0, "Fy": 0.0, "Fz": 0.0}
+# latest_force is replaced (never mutated) on every sample, so a reader that
+# grabs the reference once always sees one consistent Fx/Fy/Fz/F_shear set
+latest_force = {"Fx": 0.0, "Fy": 0.0, "Fz": 0.0, "F_shear": 0.0}
 sequence_running = False
-serial_lock = threading.Lock()
 MAX_FORCE_SENSOR_LIMIT = 10 # Newtons
 log_file = None
 logs_buffer = []
 log_f_name = ''
 SERIAL_PORT = '/dev/ttyUSB0'
+# force sensors by name, each on its own port (optional per-sensor 'calibration').
+# The primary sensor feeds latest_force, the history and the plain 'Fz (N)'
+# triggers; any sensor's channel can be used as a trigger as 'pad2:Fz (N)'.
+SENSORS = {'main': {'port': SERIAL_PORT}}
+PRIMARY_SENSOR = 'main'
 BAUDRATE = 115200
+RUNS_DB = 'runs.sqlite3' # run catalog, see /runs
+RIG_NAME = platform.node()
+RAW_CAPTURE = True # tee the raw sensor bytes of every run into log_<timestamp>.rawcap, see replay.py
 CALIBRATION_FACTORS = {'Fx': 10.0 / 0.5, 'Fy': 10.0 / 0.5, 'Fz': 10.0 / 0.49}
 step_delay = 0.001  # seconds between edges → adjust speed
 AXES = {
@@ -30,82 +47,149 @@ AXES = {
     "Z": (27, 17),
 }
 moving = {ax: False for ax in AXES}
-global_step_counts = {"X": 0, "Y": 0, "Z": 0}
-
+# True while that axis of a sequence is in its force-hold phase, see repeat_stats.along_path
+holding = {ax: False for ax in AXES}
+# set by stop_motion(); every pulse train waits on it instead of time.sleep so
+# a stop interrupts the pulse or pause in flight rather than after it
+abort_motion = threading.Event()
+# one counter per axis, only written by the thread currently driving that axis;
+# the dict itself is never rebound, reset it in place with reset_step_counts()
+global_step_counts = {ax: 0 for ax in AXES}
+HISTORY_SECONDS = 10 * 60 # keep the last 10 minutes of force samples
+HISTORY_RATE_HZ = 100 # upper bound on the poller rate, sizes the ring buffer
+HISTORY_MAX_POINTS = 2000 # default number of points returned by /force_history
+force_history = ForceHistory(HISTORY_SECONDS * HISTORY_RATE_HZ)
+JSON_ROOM = 'telemetry_json' # clients receiving per-sample JSON force/step_count events
+BINARY_ROOM = 'telemetry_binary' # clients receiving batched binary telemetry
+binary_clients = set()
+telemetry_batcher = telemetry.TelemetryBatcher()
+catalog = None # opened on first use by get_catalog(), so importing app creates no files
+catalog_lock = threading.Lock()
+current_run = {} # catalog fields of the run in progress
+run_stats = run_catalog.RunStats() # summary metrics of the run in progress, updated by force_poller
+# force-vs-displacement mean/variance across the repeats of the current run, see /repeat_stats
+repeat_aggregator = repeat_stats.RepeatAggregator()
+axis_errors = [] # exceptions raised by the axis threads of the running sequence
 
 # === Flask & SocketIO Setup ===
-app = Flask(__name__, static_folder='static')
+STATIC_DIR = 'static'
+# /static is served by send_asset() below (precompressed, cache headers)
+app = Flask(__name__, static_folder=None)
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
-# === GPIO Setup ===
-GPIO.setmode(GPIO.BCM)
-for step_pin, dir_pin in AXES.values():
-    GPIO.setup(step_pin, GPIO.OUT, initial=GPIO.LOW)
-    GPIO.setup(dir_pin, GPIO.OUT, initial=GPIO.LOW)
+# === Hardware Setup ===
+# GPIO and the force sensors are brought up by init_hardware() in a background
+# thread so the web UI is reachable immediately; /health reports progress.
+sensor_manager = sensors.SensorManager(SENSORS, PRIMARY_SENSOR)
+hardware_ready = threading.Event()
+hardware_state = {'status': 'initializing', 'error': None, 'init_seconds': None}
 
-# === Serial Sensor Setup ===
+def setup_gpio():
+    GPIO.setmode(GPIO.BCM)
+    for step_pin, dir_pin in AXES.values():
+        GPIO.setup(step_pin, GPIO.OUT, initial=GPIO.LOW)
+        GPIO.setup(dir_pin, GPIO.OUT, initial=GPIO.LOW)
 
-ser = serial.Serial(SERIAL_PORT, BAUDRATE, timeout=1)
+# === Serial Sensor Setup ===
 def init_force_sensor():
-    with serial_lock:
-        ser.write(b'\x23')
-        time.sleep(0.5)
-        ser.write(b'\x26\x01\x62\x65\x72\x6C\x69\x6E')
-        time.sleep(0.1)
-        ser.write(b'\x12\xA6')  # 12.5 Hz
-        time.sleep(0.1)
-        ser.write(b'\x0C\x01')
-        time.sleep(0.5)
-        ser.write(b'\x0C\x02')
-        time.sleep(0.5)
-        ser.write(b'\x0C\x03')
-        time.sleep(0.5)
-        ser.write(b'\x24')
-        time.sleep(0.5)
-
-init_force_sensor()
-print("Serial sensor initialized")
+    # handshakes run in parallel, one thread per port. Only the primary sensor
+    # is required; the others that fail are left out (see /health) and their
+    # handshake is retried by the next call, e.g. /zero_sensor.
+    failed = sensor_manager.init_all([s for s in sensor_manager if s.ser is not None])
+    for name, error in failed.items():
+        print(f"Force sensor {name} unavailable: {error}")
+    primary = sensor_manager.primary
+    if primary.status != 'ready':
+        raise RuntimeError(f"{primary.name}: {primary.error}")
+    return failed
+
+def init_hardware():
+    started = time.monotonic()
+    try:
+        setup_gpio()
+        for sensor in sensor_manager:
+            try:
+                sensor.ser = sensor_capture.RecordingSerial(serial.Serial(sensor.port, BAUDRATE, timeout=1))
+            except Exception as e:
+                sensor.status, sensor.error = 'error', str(e)
+        init_force_sensor()
+    except Exception as e:
+        hardware_state['status'] = 'error'
+        hardware_state['error'] = str(e)
+        print(f"Hardware initialization failed: {e}")
+        return
+    hardware_state['status'] = 'ready'
+    hardware_state['init_seconds'] = round(time.monotonic() - started, 3)
+    hardware_ready.set()
+    ready = [s.name for s in sensor_manager if s.status == 'ready']
+    print(f"Serial sensors initialized: {', '.join(ready)}")
 
 
 # === Read Force Function ===
-def read_force():
-    with serial_lock:
-        frame_header = b''
-        while frame_header != b'\xA5': # this keeps on looking and only starts if the first byte is xA5.
-            frame_header = ser.read(1)
-        frame = frame_header + ser.read(10)
-
-    if len(frame) != 11 or frame[0] != 0xA5 or frame[-2:] != b'\x0D\x0A': # more validation of frame
-        return None
-    fx = struct.unpack('>H', frame[1:3])[0]
-    fy = struct.unpack('>H', frame[3:5])[0]
-    fz = struct.unpack('>H', frame[5:7])[0]
-    def raw_to_mv_v(raw): return (raw - 32768) / 32768 * 2.0
-    force_vector =  {
-        'Fx': round(raw_to_mv_v(fx) * CALIBRATION_FACTORS['Fx'], 2),
-        'Fy': round(raw_to_mv_v(fy) * CALIBRATION_FACTORS['Fy'], 2),
-        'Fz': round(raw_to_mv_v(fz) * CALIBRATION_FACTORS['Fz'], 2),
-    }
-
-    force_vector['F_shear'] = math.sqrt(force_vector['Fx'] ** 2 + force_vector['Fy'] ** 2)
-    force_vector['F_shear'] = round(force_vector['F_shear'], 2)
-    return force_vector
-
-# === Force Poller Thread ===
-def force_poller():
-    print("Starting force poller...")
+def calibration_for(sensor):
+    return sensor.calibration or CALIBRATION_FACTORS
+
+def read_force(sensor=None):
+    sensor = sensor or sensor_manager.primary
+    return sensor.read_force(calibration_for(sensor))
+
+# === Force Poller Threads ===
+def poller_sleep(seconds):
+    # replay.py puts this on its virtual clock, like motion_sleep
+    time.sleep(seconds)
+
+def force_poller(sensor=None):
+    # one poller per sensor, each blocking only on its own port
+    global latest_force
+    sensor = sensor or sensor_manager.primary
+    primary = sensor is sensor_manager.primary
+    while not hardware_ready.wait(0.5):
+        if stop_threads or hardware_state['status'] == 'error':
+            return
+    print(f"Starting force poller for {sensor.name} ({sensor.port})...")
+    fused = len(sensor_manager) > 1
     while not stop_threads:
-        data = read_force()
+        if sensor.status != 'ready':
+            poller_sleep(0.5) # handshake failed, wait for a retry to bring it up
+            continue
+        data = read_force(sensor)
         if data:
-            latest_force.update(data)
-            socketio.emit("force", latest_force)
-            print(f"[emit] force {latest_force}")
-
-            # only add force log events in file when sequence is executing
-            if sequence_running:
-                logs_buffer.append(f'{str(datetime.datetime.now())} | {str(latest_force)} | {str(global_step_counts)} ')
-
-        time.sleep(0.01) # 10ms
+            now = time.time()
+            sensor.record(now, data)
+            sensor_manager.update() # aligned 'sensor:channel' snapshot, see sensors.py
+
+            if primary:
+                latest_force = data # atomic swap, see Global State
+                force_history.append(now, latest_force)
+                socketio.emit("force", latest_force, to=JSON_ROOM)
+                if fused:
+                    socketio.emit("channels", dict(sensor_manager.channels, t=sensor_manager.channels_t), to=JSON_ROOM)
+                if binary_clients:
+                    telemetry_batcher.add_force(now, latest_force)
+                print(f"[emit] force {latest_force}")
+
+                # only add force log events in file when sequence is executing
+                if sequence_running:
+                    counts = step_counts_snapshot()
+                    line = f'{str(datetime.datetime.now())} | {str(data)} | {str(counts)}'
+                    if fused:
+                        line += f' | {str(sensor_manager.channels)}'
+                    logs_buffer.append(line + ' ')
+                    run_stats.update(data)
+                    repeat_aggregator.add_sample(counts, data, holding=any(holding.values()))
+
+        poller_sleep(0.01) # 10ms
+
+
+# === Binary Telemetry Flusher Thread ===
+def telemetry_flusher():
+    while not stop_threads:
+        time.sleep(telemetry.FLUSH_INTERVAL)
+        if not binary_clients:
+            continue
+        payload = telemetry_batcher.drain()
+        if payload:
+            socketio.emit("telemetry", payload, to=BINARY_ROOM)
 
 
 def write_log():
@@ -117,6 +201,62 @@ def write_log():
     return
 
 
+def start_raw_capture(capture_f_name):
+    # best effort: a port that can't record or a file that can't be opened only
+    # costs the capture, never the run. Returns the primary sensor's capture path.
+    primary_path = None
+    for sensor in sensor_manager:
+        if not isinstance(sensor.ser, sensor_capture.RecordingSerial):
+            continue
+        # the primary sensor keeps the plain name replay.py and the catalog expect
+        path = capture_f_name if sensor is sensor_manager.primary \
+            else capture_f_name.replace('.rawcap', f'.{sensor.name}.rawcap')
+        try:
+            sensor.ser.start_capture(path)
+        except OSError as e:
+            print(f"Raw capture for {sensor.name} disabled for this run: {e}")
+            continue
+        if sensor is sensor_manager.primary:
+            primary_path = os.path.abspath(path)
+    return primary_path
+
+def stop_raw_capture():
+    for sensor in sensor_manager:
+        if not isinstance(sensor.ser, sensor_capture.RecordingSerial):
+            continue
+        try:
+            sensor.ser.stop_capture()
+        except OSError as e:
+            print(f"Could not close the raw capture for {sensor.name}: {e}")
+
+
+def get_catalog():
+    global catalog
+    with catalog_lock:
+        if catalog is None:
+            catalog = run_catalog.RunCatalog(RUNS_DB)
+        return catalog
+
+
+def finish_run(status):
+    # close the run's files and index it in the run catalog
+    global logs_buffer
+    stop_raw_capture()
+    write_log()
+    logs_buffer = []
+    if repeat_aggregator.repeats > 1:
+        repeat_aggregator.write_csv(log_f_name.replace('.txt', '.repeats.csv'))
+    current_run.update(run_stats.as_dict(), status=status, finished_at=time.time())
+    try:
+        current_run['data_path'] = run_data.convert_log(log_f_name, status=status)['data_path']
+    except Exception as e:
+        print(f"Could not convert {log_f_name} to structured run data: {e}")
+    try:
+        get_catalog().add_run(**current_run)
+    except Exception as e:
+        print(f"Could not add {current_run.get('run_id')} to the run catalog: {e}")
+
+
 def trigger_comparator(current_value, target_value, comparator):
     if comparator == '>=':
         return current_value >= target_value
@@ -133,10 +273,15 @@ def trigger_comparator(current_value, target_value, comparator):
 
 def check_if_trigger_fired(trigger, duration, step_count):
     if '(N)' in trigger['triggerType']:
-        force_trigger_type = trigger['triggerType'].split(' (N)')[0]  # example: Fy (N) => Fy, Fz (N) => Fz
-        current_value = latest_force.get(force_trigger_type)
+        force_trigger_type = trigger['triggerType'].split(' (N)')[0]  # example: Fy (N) => Fy, pad2:Fz (N) => pad2:Fz
+        if ':' in force_trigger_type:
+            current_value = sensor_manager.channels.get(force_trigger_type)
+            if current_value is None: # no frame from that sensor yet
+                return False
+        else:
+            current_value = latest_force.get(force_trigger_type)
         target_value = trigger['value']
-        if trigger_comparator(current_value, target_value, trigger['comparator']) or latest_force.get(force_trigger_type) > MAX_FORCE_SENSOR_LIMIT: # also return true if the current force is outside of sensor tolerance
+        if trigger_comparator(current_value, target_value, trigger['comparator']) or current_value > MAX_FORCE_SENSOR_LIMIT: # also return true if the current force is outside of sensor tolerance
             # halt movement
             return True
     
@@ -160,21 +305,69 @@ def check_if_trigger_fired(trigger, duration, step_count):
 
 
 
+def trigger_sensors(sequence):
+    # sensor names referenced by 'sensor:channel' triggers
+    names = set()
+    for axis in AXES:
+        for step in sequence.get(axis) or []:
+            data = step.get('data', {})
+            for key in ('moveInitTriggers', 'triggers', 'holdTriggers'):
+                for trig in data.get(key) or []:
+                    name, sep, _ = trig.get('triggerType', '').partition(':')
+                    if sep:
+                        names.add(name)
+    return names
+
+
+def step_counts_snapshot():
+    return dict(global_step_counts)
+
+def reset_step_counts():
+    # only call while no axis is moving, each counter is owned by its axis thread
+    for ax in global_step_counts:
+        global_step_counts[ax] = 0
+
 def axis_from_pins(step_pin):
     for ax, (sp, dp) in AXES.items():
         if sp == step_pin:
             return ax
     return None
 
+# === Motion Abort ===
+def begin_motion():
+    abort_motion.clear()
+
+def motion_sleep(seconds):
+    # returns False as soon as motion is aborted
+    return not abort_motion.wait(seconds)
+
+def halt_step_pins():
+    for step_pin, dir_pin in AXES.values():
+        GPIO.output(step_pin, GPIO.LOW)
+        GPIO.output(dir_pin, GPIO.LOW)
+
+def stop_motion():
+    global sequence_running
+    sequence_running = False
+    for ax in moving:
+        moving[ax] = False
+    abort_motion.set()
+    if hardware_ready.is_set():
+        halt_step_pins()
+
 def move_axis(step_pin, dir_pin, direction, step_size): # pulse width is dependent on the speed at which 
     
     # print('move: ', step_pin, dir_pin, direction, step_size/1000)
+    if abort_motion.is_set():
+        return
     GPIO.output(dir_pin, GPIO.HIGH if direction == 'positive' else GPIO.LOW)
     GPIO.output(step_pin, GPIO.HIGH)
-    time.sleep(step_size/1000) # step_size in (ms)
+    completed = motion_sleep(step_size/1000) # step_size in (ms)
     
     GPIO.output(step_pin, GPIO.LOW)
-    time.sleep(1/1000) # by default set it to 1ms
+    if completed:
+        motion_sleep(1/1000) # by default set it to 1ms
+    # the driver steps on the rising edge, so an interrupted pulse still counts
 
     axis = axis_from_pins(step_pin)
 
@@ -183,17 +376,18 @@ def move_axis(step_pin, dir_pin, direction, step_size): # pulse width is depende
     else:
         global_step_counts[axis] -= 1
 
-    socketio.emit("step_count", global_step_counts)
+    counts = step_counts_snapshot()
+    socketio.emit("step_count", counts, to=JSON_ROOM)
+    if binary_clients:
+        telemetry_batcher.add_steps(time.time(), counts)
     return
 
 def reset_motors_to_starting_positions():
-    global global_step_counts
-
     for axis in AXES.keys():
         step_pin = AXES[axis][0]
         dir_pin = AXES[axis][1]
         direction = 'positive' if global_step_counts[axis] > 0 else 'negative'
-        while global_step_counts[axis] != 0:
+        while global_step_counts[axis] != 0 and not abort_motion.is_set():
             move_axis(step_pin, dir_pin, direction, 1)
 
     return
@@ -206,25 +400,27 @@ def hold_force(axis, threshold, step_pin, dir_pin, direction):
     force_axis = 'F' + axis.lower() # X => Fx
 
     while sequence_running:
-        if abs(latest_force.get(force_axis) - threshold) <= 0.1: # if force along this axis is within tolerance
+        force = latest_force.get(force_axis) # read once so all comparisons use the same sample
+        if abs(force - threshold) <= 0.1: # if force along this axis is within tolerance
            return # force is within tolerance, exit from this function
         
-        elif latest_force.get(force_axis) > threshold:
+        elif force > threshold:
             # making negative movement along this axis to reduce latest force along this axis
             move_axis(step_pin, dir_pin, 'positive', 20) # use 5ms step size  
         
-        elif latest_force.get(force_axis) < threshold:
+        elif force < threshold:
             # making positive movement along this axis to increase latest force along this axis
             move_axis(step_pin, dir_pin, 'negative', 20) # use 5ms step size
 
 def _stepper_loop(axis: str, direction: bool):
     step_pin, dir_pin = AXES[axis]
     GPIO.output(dir_pin, GPIO.HIGH if direction else GPIO.LOW)
-    while moving[axis]:
+    while moving[axis] and not abort_motion.is_set():
         GPIO.output(step_pin, GPIO.HIGH)
-        time.sleep(step_delay)
+        completed = motion_sleep(step_delay)
         GPIO.output(step_pin, GPIO.LOW)
-        time.sleep(step_delay)
+        if not completed or not motion_sleep(step_delay):
+            break
 
 # === Steps Execution ===
 def execute_steps_along_axis(axis, steps):
@@ -281,6 +477,8 @@ def execute_steps_along_axis(axis, steps):
                 else:
                     # only one trigger firing is enough to start movement
                     init_movement_trigger_fired = init_movement_trigger_fired > 0
+                if not init_movement_trigger_fired:
+                    motion_sleep(1/1000) # check again in 1ms instead of spinning
 
             # moving the axis until a breaking trigger is fired.
             elif len(data['triggers']) and trigger_fired == False:
@@ -323,6 +521,7 @@ def execute_steps_along_axis(axis, steps):
 
                 hold_triggers_fired_count = 0
                 if emitted_hold_state_event == False:
+                    holding[axis] = True
                     # emitting hold state notifcaition
                     socketio.emit("log", f'Holding force: F{axis.lower()} = {data["holdThreshold"]}N')
                     logs_buffer.append(f'Holding force: F{axis.lower()} = {data["holdThreshold"]}N')
@@ -351,6 +550,7 @@ def execute_steps_along_axis(axis, steps):
                 if hold_trigger_fired == False:
                     # maintain force through movement
                     hold_force(axis, data['holdThreshold'], step_pin, dir_pin, direction) # hold force by micro-movements in this axis
+                    motion_sleep(1/1000) # within tolerance, check the hold triggers again in 1ms
                     end_time = time.time()
 
                 elif hold_trigger_fired == True:
@@ -360,30 +560,85 @@ def execute_steps_along_axis(axis, steps):
                     logs_buffer.append(message)
 
             else:
+                holding[axis] = False
                 socketio.emit("log", f"{axis}: Step {s} is completed!")
                 break # get to the next step!!
 
+def run_steps_along_axis(axis, steps):
+    # an exception here would only be printed by threading: record it and
+    # stop the other axes so the sequence ends the run as 'failed'
+    try:
+        execute_steps_along_axis(axis, steps)
+    except Exception as e:
+        axis_errors.append(f"{axis}: {e!r}")
+        logs_buffer.append(f"{str(datetime.datetime.now())} | {str(latest_force)} | Axis {axis} failed: {e!r}")
+        print(f"Axis {axis} failed: {e!r}")
+        stop_motion()
+    finally:
+        holding[axis] = False
+
 
 
 # === Sequence Execution ===
 def run_dynamic_sequence(sequence):
-
-    global sequence_running, global_step_counts, log_file, log_f_name, logs_buffer
+    global sequence_running
     if sequence_running:
         return
-    global_step_counts = {"X": 0, "Y": 0, "Z": 0}  # Reset at start
     sequence_running = True
+    try:
+        execute_sequence(sequence)
+    finally:
+        # whatever happened, never leave the server refusing motion or files open
+        if log_file is not None and not log_file.closed:
+            finish_run('failed')
+        sequence_running = False
+
+def finish_stopped_run():
+    # stopped by the user, or by an axis thread that failed (see run_steps_along_axis)
+    if axis_errors:
+        socketio.emit("log", f"Experiment failed: {'; '.join(axis_errors)}")
+        finish_run('failed')
+    else:
+        socketio.emit("log", "Experiment manually stopped")
+        finish_run('stopped')
 
-    # creating a log file
-    now = datetime.datetime.now()
-    log_f_name = f'log_{now.strftime("%Y-%m-%d__%H-%M-%S")}.txt'
-    log_file = open(log_f_name, 'w')
+def execute_sequence(sequence):
+
+    global sequence_running, log_file, log_f_name, logs_buffer, repeat_aggregator
+    reset_step_counts()  # Reset at start
+    begin_motion()
+    axis_errors.clear()
 
     repeat = 1
     if sequence['repeat']:
         repeat = sequence.pop('repeat')
         repeat = int(repeat)
 
+    # optional {"axis", "points", "channel", "sem", "minRepeats", "stopWhenConverged"},
+    # validated by /run_sequence
+    options, stop_when_converged = repeat_stats.parse_options(sequence.pop('aggregate', None), AXES)
+    repeat_aggregator = repeat_stats.RepeatAggregator(**options)
+    converged = False
+
+    # creating a log file
+    now = datetime.datetime.now()
+    log_f_name = f'log_{now.strftime("%Y-%m-%d__%H-%M-%S")}.txt'
+    log_file = open(log_f_name, 'w')
+    capture_path = start_raw_capture(log_f_name.replace('.txt', '.rawcap')) if RAW_CAPTURE else None
+
+    run_stats.reset()
+    current_run.clear()
+    current_run.update(
+        run_id=os.path.splitext(log_f_name)[0],
+        started_at=now.timestamp(),
+        sequence_hash=run_catalog.sequence_hash(sequence), # before execution marks triggers as fired
+        calibration=json.dumps(CALIBRATION_FACTORS),
+        rig=RIG_NAME,
+        repeats=0, # repeats started so far, as import_logs counts them
+        log_path=os.path.abspath(log_f_name),
+        capture_path=capture_path,
+    )
+
     # first we log the experiment schema (or the sequence to execute)
     logs_buffer.append('*************************** TestBed Config ***************************')
     logs_buffer.append(f'Force Sensor Calibration Factors: {str(CALIBRATION_FACTORS)}')
@@ -392,8 +647,10 @@ def run_dynamic_sequence(sequence):
 
     for i in range(repeat):
         logs_buffer.append(f'*************************** Execution {i} ***************************')
+        current_run['repeats'] = i + 1
 
         socketio.emit("log", f"Experiement {i} started")
+        repeat_aggregator.begin_repeat()
         threads = []
         for axis, steps in sequence.items():
             # for i, steps in enumerate(sequence[axis]):
@@ -407,7 +664,7 @@ def run_dynamic_sequence(sequence):
 
             # just feed the list of actions along each axis to apropriate thread
             t = threading.Thread(
-                target=execute_steps_along_axis,
+                target=run_steps_along_axis,
                 args=(axis, steps)
             )
             t.start() # non blocking thread for each axis
@@ -416,55 +673,43 @@ def run_dynamic_sequence(sequence):
         for t in threads:
             while t.is_alive():
                 if sequence_running == False:
+                    finish_stopped_run()
                     return
                 time.sleep(0.1) # 100ms
+        # axis threads return as soon as a stop arrives, so the poll above rarely sees it
+        if not sequence_running or abort_motion.is_set():
+            finish_stopped_run()
+            return
 
         # all threads are dead
         socketio.emit("log", f"experiment {i} completed!")
-        socketio.emit("log", f"Total steps: X {global_step_counts['X']} | Y {global_step_counts['Y']} | Z {global_step_counts['Z']}")
+        counts = step_counts_snapshot()
+        socketio.emit("log", f"Total steps: X {counts['X']} | Y {counts['Y']} | Z {counts['Z']}")
         logs_buffer.append(f'*************************** Experiment {i} Finished ***************************')
+        if repeat_aggregator.end_repeat():
+            socketio.emit("repeat_stats", dict(repeat_aggregator.as_dict(), run_id=current_run['run_id'], of=repeat))
+            converged = stop_when_converged and i < repeat - 1 and repeat_aggregator.converged()
         socketio.emit("log", f"Resetting motors to their initial state.")
         reset_motors_to_starting_positions()
+        if not sequence_running or abort_motion.is_set():
+            finish_stopped_run()
+            return
+        if converged:
+            socketio.emit("log", f"Statistics converged after {i + 1} of {repeat} repeats, stopping early.")
+            break
 
     socketio.emit("log", f"writing experiment logs in file {log_f_name}.")
-    write_log()
-    logs_buffer = []
+    finish_run('converged' if converged else 'completed')
     sequence_running = False
     return
 
-# === Manual Move Function ===
-# This function moves the axis until a force trigger is fired.
-# It takes the axis, direction, triggers, and step size as parameters.
-def move_until_force(axis, direction, triggers, step_size_ms):
-    global sequence_running
-    if axis not in AXES:
-        return
-    step_pin, dir_pin = AXES[axis]
-    dir_str = 'positive' if direction else 'negative'
-    while sequence_running:
-        trigger_fired = False
-        triggers_fired_count = 0
-        for trig in triggers:
-            if check_if_trigger_fired(trig, 0):
-                triggers_fired_count += 1
-                if trig.get('fired') is None:
-                    socketio.emit("log", f"Axis {axis}: {trig['triggerType']} trigger fired during manual move.")
-                    trig['fired'] = True
-        if triggers_fired_count > 0:
-            trigger_fired = True
-            socketio.emit("log", "Manual move stopped due to trigger.")
-        if trigger_fired:
-            break
-        move_axis(step_pin, dir_pin, dir_str, step_size_ms)
-    sequence_running = False
-    socketio.emit("log", "Manual move completed.")
-
 def motor_check():
     global sequence_running
     if sequence_running:
         socketio.emit("log", "Motor check in progress.")
         return
     sequence_running = True
+    begin_motion()
     socketio.emit("log", "Motor check started.")
     
     threads = []
@@ -476,42 +721,120 @@ def motor_check():
     for t in threads:
         t.join()
     
+    if abort_motion.is_set():
+        socketio.emit("log", "Motor check aborted.")
+        return
     sequence_running = False
     socketio.emit("log", "Motor check completed.")
 
 def motor_check_axis(axis):
     step_pin, dir_pin = AXES[axis]
-    # Forward (positive direction) for 3s at 10ms step size
-    GPIO.output(dir_pin, GPIO.HIGH)
-    start_time = time.time()
-    while time.time() - start_time < 3:
-        GPIO.output(step_pin, GPIO.HIGH)
-        time.sleep(0.01)
-        GPIO.output(step_pin, GPIO.LOW)
-        time.sleep(0.01)
-    
-    # Backward (negative direction) for 3s at 10ms step size
-    GPIO.output(dir_pin, GPIO.LOW)
-    start_time = time.time()
-    while time.time() - start_time < 3:
-        GPIO.output(step_pin, GPIO.HIGH)
-        time.sleep(0.01)
-        GPIO.output(step_pin, GPIO.LOW)
-        time.sleep(0.01)
+    # Forward (positive direction) for 3s at 10ms step size,
+    # then backward (negative direction) for 3s at 10ms step size
+    for level in (GPIO.HIGH, GPIO.LOW):
+        GPIO.output(dir_pin, level)
+        start_time = time.time()
+        while time.time() - start_time < 3 and not abort_motion.is_set():
+            GPIO.output(step_pin, GPIO.HIGH)
+            completed = motion_sleep(0.01)
+            GPIO.output(step_pin, GPIO.LOW)
+            if not completed or not motion_sleep(0.01):
+                return
+
+# === Streaming Jog ===
+# one persistent motion thread driven by velocity set-points from the "jog"
+# socket event (see jog.py); /start and /stop remain for plain HTTP clients
+JOG_PULSE_S = 0.0001
+
+def jog_step(axis, forward):
+    step_pin, dir_pin = AXES[axis]
+    GPIO.output(dir_pin, GPIO.HIGH if forward else GPIO.LOW)
+    GPIO.output(step_pin, GPIO.HIGH)
+    time.sleep(JOG_PULSE_S)
+    GPIO.output(step_pin, GPIO.LOW)
+    # same sign convention as move_axis, where 'positive' (dir HIGH) counts down
+    global_step_counts[axis] += -1 if forward else 1
+
+def jog_blocked():
+    return abort_motion.is_set() or sequence_running
+
+def jog_ack(sid, ack):
+    if sid:
+        socketio.emit("jog_ack", ack, to=sid)
+
+def jog_steps():
+    counts = step_counts_snapshot()
+    socketio.emit("step_count", counts, to=JSON_ROOM)
+    if binary_clients:
+        telemetry_batcher.add_steps(time.time(), counts)
+
+jog_controller = jog.JogController(AXES, jog_step, blocked=jog_blocked, on_ack=jog_ack, on_steps=jog_steps)
 
 # === Flask Routes ===
 @app.route('/')
 def index():
-    return send_from_directory('static', 'index.html')
+    # the built index.html references content-hashed assets, run build_assets.py to create it
+    if assets.has_build(STATIC_DIR):
+        return assets.send_asset(STATIC_DIR, f'{assets.DIST_DIR}/index.html')
+    return assets.send_asset(STATIC_DIR, 'index.html')
+
+@app.route('/static/<path:filename>')
+def static_files(filename):
+    return assets.send_asset(STATIC_DIR, filename)
+
+@app.route('/health')
+def health():
+    body = dict(hardware_state, sequence_running=sequence_running, sensors=sensor_manager.status())
+    return jsonify(body), (200 if hardware_ready.is_set() else 503)
 
 @app.route('/live_force')
 def live_force():
     return jsonify(latest_force)
 
+@app.route('/repeat_stats')
+def get_repeat_stats():
+    # aggregate of the current (or last) run, also pushed as "repeat_stats" after every repeat
+    return jsonify(dict(repeat_aggregator.as_dict(), run_id=current_run.get('run_id')))
+
+@app.route('/live_channels')
+def live_channels():
+    return jsonify(sensor_manager.channels)
+
+@app.route('/force_history')
+def get_force_history():
+    # ?since=<epoch seconds>&max_points=<n>&channels=Fx,Fz&encoding=f32|json
+    since = request.args.get('since', type=float)
+    max_points = request.args.get('max_points', HISTORY_MAX_POINTS, type=int)
+    encoding = request.args.get('encoding', 'f32')
+    channels = request.args.get('channels')
+    if channels:
+        channels = channels.split(',')
+        unknown = [ch for ch in channels if ch not in force_history.channels]
+        if unknown:
+            return f"Unknown channels: {', '.join(unknown)}", 400
+    if encoding not in ('f32', 'json') or max_points < 1:
+        return "Invalid query", 400
+    (t, data), decimated = force_history.query(since, max_points, channels or None)
+    return jsonify(encode_window(t, data, decimated, encoding))
+
 @app.route('/run_sequence', methods=['POST'])
 def run_sequence():
+    if not hardware_ready.is_set():
+        return "Hardware not ready", 503
     raw = request.get_json()
     print('raw: ', raw)
+    referenced = trigger_sensors(raw)
+    unknown = referenced - set(sensor_manager.sensors)
+    if unknown:
+        return f"Unknown sensor in triggers: {', '.join(sorted(unknown))}", 400
+    # a trigger on a sensor that is down would never fire
+    down = sorted(name for name in referenced - unknown if sensor_manager.sensors[name].status != 'ready')
+    if down:
+        return f"Sensor not available: {', '.join(down)}", 503
+    try:
+        repeat_stats.parse_options(raw.get('aggregate'), AXES)
+    except ValueError as e:
+        return f"Invalid aggregate: {e}", 400
     # if not isinstance(raw, list):
     #     return "Invalid format", 400
     parsed = raw
@@ -521,17 +844,12 @@ def run_sequence():
 
 @app.route('/stop_sequence', methods=['POST'])
 def stop_sequence():
-    global sequence_running
-    sequence_running = False
+    stop_motion()
     return "Stopping"
 
 @app.route('/emergency_stop', methods=['POST'])
 def emergency_stop():
-    global sequence_running
-    sequence_running = False
-    for step_pin, dir_pin in AXES.values():
-        GPIO.output(step_pin, GPIO.LOW)
-        GPIO.output(dir_pin, GPIO.LOW)
+    stop_motion()
     socketio.emit("log", "Emergency stop: All motors halted.")
     return "Emergency stopped"
 
@@ -541,9 +859,12 @@ def start():
     dir_flag = request.args.get('dir')
     if axis not in AXES or dir_flag not in ('0','1'):
         abort(400)
+    if not hardware_ready.is_set():
+        return "Hardware not ready", 503
     direction = (dir_flag == '1')
     if not moving[axis]:
         moving[axis] = True
+        begin_motion()
         threading.Thread(target=_stepper_loop, args=(axis, direction), daemon=True).start()
     return 'OK'
 
@@ -557,23 +878,85 @@ def stop():
 
 @app.route('/motor_check', methods=['POST'])
 def run_motor_check():
+    if not hardware_ready.is_set():
+        return "Hardware not ready", 503
     socketio.start_background_task(motor_check)
     return "Motor check started"
 
+@socketio.on("connect")
+def handle_connect():
+    # every client starts on the JSON events until it negotiates otherwise
+    join_room(JSON_ROOM)
+
+@socketio.on("disconnect")
+def handle_disconnect():
+    binary_clients.discard(request.sid)
+    jog_controller.release(request.sid)
+
+@socketio.on("telemetry_format")
+def handle_telemetry_format(data):
+    fmt = (data or {}).get("format")
+    if fmt == "binary":
+        leave_room(JSON_ROOM)
+        join_room(BINARY_ROOM)
+        binary_clients.add(request.sid)
+        socketio.emit("telemetry_schema", telemetry.SCHEMA, to=request.sid)
+    elif fmt == "json":
+        leave_room(BINARY_ROOM)
+        join_room(JSON_ROOM)
+        binary_clients.discard(request.sid)
+
+@socketio.on("jog")
+def handle_jog(data):
+    # {"seq": n, "v": {"X": -1..1, ...}, "rtt": last measured round trip in ms},
+    # re-sent every ~20 ms while a jog control is held
+    data = data or {}
+    seq = data.get("seq")
+    try:
+        velocities = {ax: float(v or 0) for ax, v in (data.get("v") or {}).items() if ax in AXES}
+        rtt = data.get("rtt")
+        rtt = float(rtt) if rtt is not None else None
+    except (TypeError, ValueError):
+        socketio.emit("jog_ack", {"seq": seq, "rejected": "invalid set-point"}, to=request.sid)
+        return
+    wants_motion = any(velocities.values())
+    if wants_motion and not hardware_ready.is_set():
+        socketio.emit("jog_ack", {"seq": seq, "rejected": "hardware not ready"}, to=request.sid)
+        return
+    if wants_motion and sequence_running:
+        socketio.emit("jog_ack", {"seq": seq, "rejected": "movement already in progress"}, to=request.sid)
+        return
+    if wants_motion and abort_motion.is_set() and jog_controller.idle():
+        begin_motion() # a fresh press after a stop, like /start
+    if not jog_controller.set_point(velocities, seq=seq, sid=request.sid, rtt_ms=rtt):
+        socketio.emit("jog_ack", {"seq": seq, "rejected": "stopped, release the control first"}, to=request.sid)
+
+@app.route('/jog/stats')
+def jog_stats():
+    return jsonify(jog_controller.stats())
+
 @socketio.on("manual_move")
 def handle_manual_move(data):
-    global sequence_running
+    # one-shot move from window.manualMove: a single full-speed jog set-point,
+    # so the jog ramp and dead-man bound it to a short nudge
+    data = data or {}
     axis = data.get("axis")
     direction = bool(data.get("direction"))
     if axis not in AXES:
         socketio.emit("log", f"Invalid axis: {axis}")
         return
+    if not hardware_ready.is_set():
+        socketio.emit("log", "Hardware not ready.")
+        return
     if sequence_running:
         socketio.emit("log", "Movement already in progress.")
         return
-    sequence_running = True
+    if abort_motion.is_set() and jog_controller.idle():
+        begin_motion() # a fresh press after a stop, like /start
+    if not jog_controller.set_point({axis: 1 if direction else -1}, sid=request.sid):
+        socketio.emit("log", "Stopped, release the jog control first.")
+        return
     socketio.emit("log", f"Manual move on {axis} axis ({'+' if direction else '-'})")
-    socketio.start_background_task(move_until_force, axis, direction, [], 1)  # 1ms step size
 
 
 @app.route('/export_data', methods=['GET'])
@@ -581,10 +964,55 @@ def export_data():
     global log_f_name
     return send_from_directory('.', log_f_name, as_attachment=True)
 
+@app.route('/runs')
+def list_runs():
+    # ?since=&until=<epoch s>&sequence_hash=&rig=&status=&min_max_fz=&limit=&offset=
+    filters = {}
+    for key in run_catalog.FILTERS:
+        value = request.args.get(key)
+        if value is None:
+            continue
+        if key in ('since', 'until', 'min_max_fz'):
+            try:
+                value = float(value)
+            except ValueError:
+                return f"Invalid {key}", 400
+        filters[key] = value
+    # SQLite treats a negative LIMIT as unlimited
+    limit = max(1, min(request.args.get('limit', 50, type=int), 1000))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    total, runs = get_catalog().list_runs(filters, limit, offset)
+    return jsonify({'total': total, 'limit': limit, 'offset': offset, 'runs': runs})
+
+@app.route('/runs/<run_id>')
+def get_run(run_id):
+    run = get_catalog().get_run(run_id)
+    if run is None:
+        return "Unknown run", 404
+    return jsonify(run)
+
+@app.route('/runs/<run_id>/download')
+def download_run(run_id):
+    # ?file=log (default) | capture | data
+    run = get_catalog().get_run(run_id)
+    path = run and run.get(f"{request.args.get('file', 'log')}_path")
+    if not path or not os.path.isfile(path):
+        return "File not available", 404
+    return send_from_directory(os.path.dirname(path), os.path.basename(path), as_attachment=True)
+
 @app.route('/zero_sensor', methods=['POST'])
 def zero_sensor():
-    init_force_sensor()
-    socketio.emit("log", "Sensor zeroed.")
+    if not hardware_ready.is_set():
+        return "Hardware not ready", 503
+    try:
+        failed = init_force_sensor()
+    except RuntimeError as e:
+        socketio.emit("log", f"Sensor zeroing failed: {e}")
+        return f"Sensor zeroing failed: {e}", 503
+    if failed:
+        socketio.emit("log", f"Sensor zeroed, unavailable: {', '.join(sorted(failed))}.")
+    else:
+        socketio.emit("log", "Sensor zeroed.")
     return 'sensor zeroed'
 
 @app.route('/calibrate', methods=['POST'])
@@ -649,16 +1077,20 @@ def download_state_json():
 # === Launch App ===
 if __name__ == '__main__':
     try:
-        threading.Thread(target=force_poller, daemon=True).start()
+        threading.Thread(target=init_hardware, daemon=True).start()
+        for sensor in sensor_manager:
+            threading.Thread(target=force_poller, args=(sensor,), daemon=True).start()
+        threading.Thread(target=telemetry_flusher, daemon=True).start()
+        jog_controller.start()
         print("Flask-SocketIO server starting...")
         socketio.run(app, host='0.0.0.0', port=5000)
     finally:
         stop_threads = True
         time.sleep(0.1)
-        GPIO.cleanup()
-        ser.write(b'\x23') # stopping force sensor data transmission
-        time.sleep(0.5)
-        ser.close()
+        if hardware_ready.is_set():
+            GPIO.cleanup()
+            for sensor in sensor_manager:
+                sensor.close()
         print("Clean exit")
         print("GPIO and serial port cleaned up.")
         print("Threads stopped.")
@@ -0,0 +1,51 @@
+"""
+Serve UI assets built by build_assets.py.
+
+Files under static/dist/ carry a content hash in their name, so they are
+sent with a one-year immutable Cache-Control; everything else (including
+the built index.html) must be revalidated, which costs a 304 thanks to the
+ETag. When the browser accepts it, the precompressed .br/.gz variant is
+sent instead of the plain file so the Pi never compresses on the fly.
+"""
+
+import mimetypes
+import os
+
+from flask import abort, request, send_file
+from werkzeug.security import safe_join
+
+from build_assets import DIST_DIR
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+ENCODINGS = (('br', '.br'), ('gzip', '.gz')) # in order of preference
+
+
+def has_build(static_dir):
+    return os.path.isfile(os.path.join(static_dir, DIST_DIR, 'index.html'))
+
+
+def send_asset(static_dir, filename):
+    path = safe_join(os.path.abspath(static_dir), filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    hashed = filename.startswith(DIST_DIR + '/') and not filename.endswith('.html')
+    max_age = IMMUTABLE_MAX_AGE if hashed else 0
+
+    encoding = None
+    for enc, suffix in ENCODINGS:
+        if request.accept_encodings[enc] and os.path.isfile(path + suffix):
+            encoding, path = enc, path + suffix
+            break
+
+    # each variant is its own file, so the default ETag already differs per encoding
+    response = send_file(path, mimetype=mimetype, conditional=True, max_age=max_age)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    if hashed:
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Measure emergency stop latency against simulated hardware.
+
+RPi.GPIO and pyserial are replaced by in-memory fakes that timestamp every
+pin write, then app.py is imported and each motion path (sequence step,
+jog, reset to start, motor check) is started and stopped through the real
+/emergency_stop route at a random point. The latency is the time from
+sending the request to the last rising edge on any step pin; the worst
+case over all trials is reported per path.
+
+Exits non-zero if any path's worst case exceeds --max-latency or if a path
+was not pulsing in every trial when the stop was sent (i.e. never moved).
+
+    python bench_abort_latency.py --trials 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import sim_hardware
+
+
+def endless_step(step_size_ms):
+    # a move step whose break trigger never fires
+    return {'data': {
+        'direction': 'positive', 'stepSize': step_size_ms, 'holdThreshold': 'NaN',
+        'moveInitTriggers': [], 'fireAllInitTriggers': 'False',
+        'triggers': [{'triggerType': 'steps', 'comparator': '>=', 'value': 10 ** 9}],
+        'fireAllTriggers': 'False', 'holdTriggers': [], 'fireAllHoldTriggers': 'False',
+    }}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trials', type=int, default=20, help='stops per motion path')
+    parser.add_argument('--step-size', type=float, default=20, help='sequence pulse width in ms')
+    parser.add_argument('--max-latency', type=float, default=5, help='worst-case bound in ms')
+    args = parser.parse_args()
+
+    gpio = sim_hardware.install()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp()) # run logs are written to the working directory
+    import app
+
+    sim_hardware.mark_ready(app)
+    client = app.app.test_client()
+
+    def start_sequence():
+        client.post('/run_sequence', json={'X': [endless_step(args.step_size)], 'Y': [], 'Z': [], 'repeat': 1})
+
+    def start_jog():
+        client.get('/start?axis=Y&dir=1')
+
+    def start_reset():
+        app.begin_motion()
+        app.global_step_counts['Z'] = 10 ** 6
+        threading.Thread(target=app.reset_motors_to_starting_positions, daemon=True).start()
+
+    def start_motor_check():
+        client.post('/motor_check')
+
+    paths = {
+        'sequence': start_sequence,
+        'jog': start_jog,
+        'reset': start_reset,
+        'motor_check': start_motor_check,
+    }
+
+    failures = []
+    print(f"{'path':>12} {'moving':>6} {'mean ms':>8} {'worst ms':>9}")
+    for name, start in paths.items():
+        latencies = []
+        moving = 0 # trials where the axis was really pulsing when the stop was sent
+        for _ in range(args.trials):
+            start()
+            time.sleep(random.uniform(0.05, 0.25))
+            requested = time.perf_counter()
+            moving += requested - gpio.last_rise < 2 * args.step_size / 1000
+            client.post('/emergency_stop')
+            time.sleep(0.1) # let any straggling pulse land
+            latencies.append(max(0.0, gpio.last_rise - requested) * 1000)
+            app.reset_step_counts()
+        print(f"{name:>12} {f'{moving}/{args.trials}':>6} {sum(latencies) / len(latencies):>8.3f} {max(latencies):>9.3f}")
+        if moving != args.trials:
+            failures.append(f"{name}: moving in only {moving}/{args.trials} trials")
+        if max(latencies) > args.max_latency:
+            failures.append(f"{name}: worst case {max(latencies):.3f} ms > {args.max_latency} ms")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Measure UI page loads with and without a build_assets.py build.
+
+Copies the static folder to a temporary directory and serves it through
+assets.send_asset() the way app.py does, once as plain files and once
+after build(). A page load fetches / and every local stylesheet and module
+it references (following the modules' own imports), with the Accept-Encoding
+of a current browser. A cold load starts with an empty cache; a warm load
+revalidates what the cache requires and skips what it may reuse (immutable
+hashed assets). Reported per load: requests, bytes on the wire (bodies and
+headers) and server time and CPU, the latter being what the Pi spends.
+
+    python bench_assets.py --static-dir static --loads 50
+"""
+
+import argparse
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from flask import Flask
+
+import assets
+import build_assets
+
+ACCEPT_ENCODING = 'gzip, deflate, br'
+# "static/socket.js", '/static/dist/main.0123456789.js', ... in the page
+PAGE_REF = re.compile(r"""(['"])/?(static/[\w./-]+\.(?:js|css))\1""")
+# './chartPanel.js' inside a module, relative to the module
+MODULE_IMPORT = build_assets.MODULE_IMPORT
+
+
+def make_app(static_dir):
+    # the asset routes of app.py, without the hardware
+    app = Flask(__name__, static_folder=None)
+
+    @app.route('/')
+    def index():
+        if assets.has_build(static_dir):
+            return assets.send_asset(static_dir, f'{build_assets.DIST_DIR}/index.html')
+        return assets.send_asset(static_dir, 'index.html')
+
+    @app.route('/static/<path:filename>')
+    def static_files(filename):
+        return assets.send_asset(static_dir, filename)
+
+    return app
+
+
+def wire_bytes(response):
+    headers = sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+    return headers + len(response.get_data())
+
+
+def page_load(client, cache):
+    """Fetch the page and what it references; cache: url -> (etag, immutable)."""
+    requests = transferred = 0
+    queue, seen = ['/'], set()
+    while queue:
+        url = queue.pop(0)
+        if url in seen:
+            continue
+        seen.add(url)
+        etag, immutable = cache.get(url, (None, False))
+        if not immutable:
+            headers = {'Accept-Encoding': ACCEPT_ENCODING}
+            if etag:
+                headers['If-None-Match'] = etag
+            response = client.get(url, headers=headers)
+            requests += 1
+            transferred += wire_bytes(response)
+            if response.status_code == 200:
+                cache[url] = (response.headers.get('ETag'),
+                              'immutable' in response.headers.get('Cache-Control', ''))
+            response.close()
+        # the references only depend on the file, read it from disk like the cache would hold it
+        path = url_to_path(client.application, url)
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        if url == '/':
+            queue += ['/' + m.group(2) for m in PAGE_REF.finditer(text)]
+        elif url.endswith('.js'):
+            base = url.rsplit('/', 1)[0]
+            queue += [f'{base}/{m.group(2)}' for m in MODULE_IMPORT.finditer(text)]
+    return requests, transferred
+
+
+def url_to_path(app, url):
+    static_dir = app.config['STATIC_DIR']
+    if url == '/':
+        name = f'{build_assets.DIST_DIR}/index.html' if assets.has_build(static_dir) else 'index.html'
+    else:
+        name = url[len('/static/'):]
+    return os.path.join(static_dir, name)
+
+
+def measure(static_dir, loads):
+    app = make_app(static_dir)
+    app.config['STATIC_DIR'] = static_dir
+    client = app.test_client()
+    results = {}
+    for kind in ('cold', 'warm'):
+        cache = {}
+        if kind == 'warm':
+            page_load(client, cache)
+        wall = cpu = 0.0
+        for _ in range(loads):
+            load_cache = dict(cache) if kind == 'warm' else {}
+            started, cpu_started = time.perf_counter(), time.process_time()
+            requests, transferred = page_load(client, load_cache)
+            wall += time.perf_counter() - started
+            cpu += time.process_time() - cpu_started
+        results[kind] = (requests, transferred, wall / loads * 1000, cpu / loads * 1000)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--static-dir', default='static', help='folder the server serves /static from')
+    parser.add_argument('--loads', type=int, default=20, help='page loads per measurement')
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp()
+    try:
+        static_dir = os.path.join(work, 'static')
+        shutil.copytree(args.static_dir, static_dir,
+                        ignore=shutil.ignore_patterns(build_assets.DIST_DIR))
+        plain = measure(static_dir, args.loads)
+        build_assets.build(static_dir)
+        built = measure(static_dir, args.loads)
+    finally:
+        shutil.rmtree(work)
+
+    print(f"{'load':>12} {'requests':>9} {'bytes':>9} {'server ms':>10} {'cpu ms':>8}")
+    for label, results in (('plain', plain), ('built', built)):
+        for kind, (requests, transferred, wall_ms, cpu_ms) in results.items():
+            print(f"{label + ' ' + kind:>12} {requests:>9} {transferred:>9} {wall_ms:>10.2f} {cpu_ms:>8.2f}")
+    if build_assets.brotli is None:
+        print('(brotli not installed, the build only has .gz variants)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Measure streaming jog latency against simulated hardware.
+
+A Socket.IO test client streams "jog" set-points every --interval ms to
+app.py (GPIO and serial simulated, see sim_hardware.py) as a held jog
+control would, then ends each trial one of three ways: releasing the
+control, going silent (dead-man) or /emergency_stop. Reported are the
+controller's set-point-to-motion latencies (see jog.py) and, per stop
+mode, the time from the stop to the last rising edge on a step pin, which
+includes the deceleration ramp for release and dead-man stops.
+
+    python bench_jog_latency.py --trials 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import sim_hardware
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trials', type=int, default=10, help='jogs per stop mode')
+    parser.add_argument('--interval', type=float, default=20, help='set-point interval in ms')
+    args = parser.parse_args()
+
+    gpio = sim_hardware.install()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp())
+    import app
+
+    sim_hardware.mark_ready(app)
+    app.jog_controller.start()
+    client = app.socketio.test_client(app.app)
+    seq = 0
+
+    def send(v):
+        nonlocal seq
+        seq += 1
+        client.emit('jog', {'seq': seq, 'v': v})
+
+    def hold(seconds):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            send({'Y': random.choice((-1, 1)) if seq % 10 == 0 else 1})
+            time.sleep(args.interval / 1000)
+
+    def release():
+        send({})
+
+    def go_silent():
+        pass
+
+    def estop():
+        app.stop_motion()
+
+    modes = {'release': release, 'deadman': go_silent, 'estop': estop}
+    stops = {}
+    for name, stop in modes.items():
+        stops[name] = []
+        for _ in range(args.trials):
+            hold(random.uniform(0.2, 0.4))
+            requested = time.perf_counter()
+            stop()
+            while not app.jog_controller.idle() and not app.jog_controller.latched:
+                time.sleep(0.005)
+            time.sleep(0.05)
+            stops[name].append(max(0.0, gpio.last_rise - requested) * 1000)
+            release() # unlatch after an emergency stop
+            time.sleep(0.02)
+        client.get_received() # drop acks and step counts
+
+    stats = app.jog_controller.stats()
+    print(f"{'set-point to motion':>20} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for key in ('apply_ms', 'first_step_ms'):
+        s = stats[key]
+        print(f"{key:>20} {s['count']:>6} {s['p50']:>8.3f} {s['p95']:>8.3f} {s['max']:>8.3f}")
+    print(f"\n{'stop':>20} {'mean ms':>8} {'worst ms':>9}")
+    for name, latencies in stops.items():
+        print(f"{name:>20} {sum(latencies) / len(latencies):>8.3f} {max(latencies):>9.3f}")
+    print(f"\ndead-man trips: {stats['deadman_trips']}, steps per s at full speed: {stats['max_speed']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON vs binary telemetry.
+
+Replays the server's emit workload for a simulated run (force samples at
+--rate Hz, motor steps at --step-rate Hz) for several client counts and
+reports wire bytes per second and server CPU seconds per second of run
+time. Packets are framed the way Socket.IO v5 does it on the wire:
+`42["event",{...}]` for JSON events and a `451-[...]` placeholder packet
+plus one binary attachment for the batched binary event. Like
+python-socketio, each recipient's packet is encoded separately.
+
+    python bench_telemetry.py --rate 100 --clients 1 4 8
+"""
+
+import argparse
+import json
+import random
+import time
+
+import telemetry
+
+
+def fake_force():
+    fx, fy, fz = random.uniform(-2, 2), random.uniform(-2, 2), random.uniform(0, 8)
+    return {'Fx': round(fx, 2), 'Fy': round(fy, 2), 'Fz': round(fz, 2),
+            'F_shear': round((fx ** 2 + fy ** 2) ** 0.5, 2)}
+
+
+def make_events(seconds, rate, step_rate):
+    # merged, time ordered list of ('force' | 'steps', t, payload)
+    events = []
+    t0 = time.time()
+    for i in range(int(seconds * rate)):
+        events.append(('force', t0 + i / rate, fake_force()))
+    counts = {'X': 0, 'Y': 0, 'Z': 0}
+    for i in range(int(seconds * step_rate)):
+        counts = dict(counts, Z=counts['Z'] + 1)
+        events.append(('steps', t0 + i / step_rate, counts))
+    events.sort(key=lambda e: e[1])
+    return events
+
+
+def run_json(events, clients):
+    sent = 0
+    for kind, _, payload in events:
+        name = 'force' if kind == 'force' else 'step_count'
+        for _ in range(clients):
+            sent += len(('42' + json.dumps([name, payload], separators=(',', ':'))).encode())
+    return sent
+
+
+def run_binary(events, clients):
+    sent = 0
+    batcher = telemetry.TelemetryBatcher()
+    next_flush = events[0][1] + telemetry.FLUSH_INTERVAL
+
+    def flush():
+        nonlocal sent
+        payload = batcher.drain()
+        if payload is None:
+            return
+        for _ in range(clients):
+            header = '451-' + json.dumps(['telemetry', {'_placeholder': True, 'num': 0}], separators=(',', ':'))
+            sent += len(header.encode()) + len(payload)
+
+    for kind, t, payload in events:
+        while t >= next_flush:
+            flush()
+            next_flush += telemetry.FLUSH_INTERVAL
+        if kind == 'force':
+            batcher.add_force(t, payload)
+        else:
+            batcher.add_steps(t, payload)
+    flush()
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10.0, help='simulated run length')
+    parser.add_argument('--rate', type=float, nargs='+', default=[100.0, 250.0], help='force samples per second')
+    parser.add_argument('--step-rate', type=float, default=500.0, help='motor steps per second')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 8])
+    args = parser.parse_args()
+
+    print(f"{'rate':>6} {'clients':>7} {'mode':>6} {'bytes/s':>12} {'cpu s/s':>9}")
+    for rate in args.rate:
+        events = make_events(args.seconds, rate, args.step_rate)
+        for clients in args.clients:
+            for mode, fn in (('json', run_json), ('binary', run_binary)):
+                start = time.process_time()
+                sent = fn(events, clients)
+                cpu = time.process_time() - start
+                print(f"{rate:>6.0f} {clients:>7} {mode:>6} {sent / args.seconds:>12.0f} {cpu / args.seconds:>9.4f}")
+
+
+if __name__ == '__main__':
+    main()
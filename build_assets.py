@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Build content-hashed, precompressed copies of the UI assets.
+
+Every .js/.css file in the static folder is copied to static/dist/ as
+<name>.<hash>.<ext> together with .gz (and .br when the optional `brotli`
+package is installed) variants, so the server can send them compressed
+without spending CPU per request and let browsers cache them forever.
+Relative module imports between the .js files and the asset references in
+index.html are rewritten to the hashed names, and the mapping is written to
+static/dist/manifest.json.
+
+    python build_assets.py [--static-dir static]
+
+Re-run after editing any asset; the server picks up the new manifest on
+restart and falls back to the plain files when no build exists.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DIST_DIR = 'dist'
+MANIFEST = 'manifest.json'
+HASH_LEN = 10
+
+# './chartPanel.js' style specifiers inside ES modules
+MODULE_IMPORT = re.compile(r"""(['"])\./([\w.-]+\.js)\1""")
+# 'static/socket.js', '/static/main.js', "static/style.css" in index.html
+STATIC_REF = re.compile(r"""(['"])/?static/([\w.-]+\.(?:js|css))\1""")
+
+
+def write_compressed(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+    with open(path + '.gz', 'wb') as f:
+        # mtime=0 keeps the .gz output (and its ETag) stable between builds
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def build(static_dir):
+    dist = os.path.join(static_dir, DIST_DIR)
+    os.makedirs(dist, exist_ok=True)
+
+    sources = {}
+    for name in sorted(os.listdir(static_dir)):
+        if name.endswith(('.js', '.css')) and os.path.isfile(os.path.join(static_dir, name)):
+            with open(os.path.join(static_dir, name), encoding='utf-8') as f:
+                sources[name] = f.read()
+
+    manifest = {}
+
+    def hashed_name(name, stack=()):
+        # a module's hash covers the hashed names of what it imports, so
+        # changing a dependency also renames every module importing it
+        if name in manifest:
+            return manifest[name]
+        if name in stack:
+            raise ValueError(f'import cycle through {name}')
+        text = sources[name]
+        if name.endswith('.js'):
+            def rewrite(m):
+                if m.group(2) not in sources:
+                    return m.group(0)
+                return f"{m.group(1)}./{hashed_name(m.group(2), stack + (name,))}{m.group(1)}"
+            text = MODULE_IMPORT.sub(rewrite, text)
+        data = text.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LEN]
+        stem, ext = os.path.splitext(name)
+        out = f'{stem}.{digest}{ext}'
+        write_compressed(os.path.join(dist, out), data)
+        manifest[name] = out
+        return out
+
+    for name in sources:
+        hashed_name(name)
+
+    index_src = os.path.join(static_dir, 'index.html')
+    if os.path.isfile(index_src):
+        with open(index_src, encoding='utf-8') as f:
+            html = f.read()
+        html = STATIC_REF.sub(
+            lambda m: f"{m.group(1)}/static/{DIST_DIR}/{manifest[m.group(2)]}{m.group(1)}"
+            if m.group(2) in manifest else m.group(0), html)
+        # lets the page resolve lazily loaded assets (e.g. visualizers) to hashed names
+        inline = f'<script>window.ASSET_MANIFEST = {json.dumps(manifest)};</script>\n'
+        html = html.replace('</head>', inline + '</head>', 1)
+        write_compressed(os.path.join(dist, 'index.html'), html.encode('utf-8'))
+
+    with open(os.path.join(dist, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    # drop outputs of previous builds that are no longer referenced
+    current = set(manifest.values()) | {'index.html', MANIFEST}
+    for name in os.listdir(dist):
+        base = name[:-3] if name.endswith(('.gz', '.br')) else name
+        if base not in current:
+            os.remove(os.path.join(dist, name))
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--static-dir', default='static', help='folder the server serves /static from')
+    args = parser.parse_args()
+
+    manifest = build(args.static_dir)
+    raw = sum(os.path.getsize(os.path.join(args.static_dir, n)) for n in manifest)
+    gz = sum(os.path.getsize(os.path.join(args.static_dir, DIST_DIR, h + '.gz')) for h in manifest.values())
+    print(f'{len(manifest)} assets, {raw} bytes -> {gz} bytes gzip'
+          + ('' if brotli is not None else ' (install brotli for .br variants)'))
+
+
+if __name__ == '__main__':
+    main()
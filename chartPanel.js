@@ -1,6 +1,8 @@
 let chart = null;
 let startTime = null;
 let collecting = false;
+let redrawPending = false;
+const WINDOW_S = 10 * 60; // same span as the server-side history (HISTORY_SECONDS)
 
 export function initChartPanel() {
   const container = document.getElementById("chart-panel");
@@ -18,7 +20,7 @@ export function initChartPanel() {
   `;
 }
 
-export function startPlotting() {
+export function startPlotting(history = []) {
   startTime = Date.now();
   collecting = true;
 
@@ -35,7 +37,7 @@ export function startPlotting() {
     data: {
       datasets: [{
         label: 'Fz (N)',
-        data: [],
+        data: history,
         borderColor: '#2196F3',
         tension: 0.2,
         fill: false,
@@ -69,9 +71,49 @@ export function stopPlotting() {
   collecting = false;
 }
 
-export function pushForce(fz) {
+// tMs: sample time in client milliseconds, defaults to now
+export function pushForce(fz, tMs = Date.now()) {
   if (!collecting || !chart) return;
-  const t = (Date.now() - startTime) / 1000;
-  chart.data.datasets[0].data.push({ x: t, y: fz });
-  chart.update('none');
+  const t = (tMs - startTime) / 1000;
+  const data = chart.data.datasets[0].data;
+  data.push({ x: t, y: fz });
+  // a chart seeded on connect keeps collecting, so only keep the history window
+  let stale = 0;
+  while (stale < data.length && data[stale].x < t - WINDOW_S) stale++;
+  if (stale) data.splice(0, stale);
+  // redraw at most once per frame, not once per sample
+  if (!redrawPending) {
+    redrawPending = true;
+    requestAnimationFrame(() => {
+      redrawPending = false;
+      if (chart) chart.update('none');
+    });
+  }
+}
+
+// decode one base64 float32 series from /force_history
+function decodeSeries(b64) {
+  const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+  return new Float32Array(bytes.buffer);
+}
+
+// seed a chart with the server-side history so late joiners see context
+export async function loadForceHistory(maxPoints = 2000) {
+  if (chart) return; // already plotting, e.g. after a reconnect
+  try {
+    const res = await fetch(`/force_history?channels=Fz&max_points=${maxPoints}`);
+    if (!res.ok) return;
+    const hist = await res.json();
+    if (!hist.count) return;
+
+    const t = decodeSeries(hist.t);
+    const fz = decodeSeries(hist.Fz);
+    const points = Array.from(t, (x, i) => ({ x, y: fz[i] }));
+
+    startPlotting(points);
+    // line up live samples with the end of the history
+    startTime = Date.now() - t[t.length - 1] * 1000;
+  } catch (err) {
+    console.warn("Could not load force history:", err);
+  }
 }
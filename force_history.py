@@ -0,0 +1,143 @@
+"""
+Fixed-size ring buffer of timestamped force samples.
+
+The buffer is preallocated once (one array per channel) so the poller
+never allocates while appending, and the oldest samples are overwritten
+once it is full. Readers take a consistent copy of a time window and can
+ask for a min/max decimated version of it for plotting.
+"""
+
+from array import array
+import base64
+import sys
+import threading
+
+CHANNELS = ('Fx', 'Fy', 'Fz', 'F_shear')
+
+
+class ForceHistory:
+    def __init__(self, capacity, channels=CHANNELS):
+        self.capacity = int(capacity)
+        self.channels = tuple(channels)
+        self._t = array('d', bytes(8 * self.capacity))
+        self._data = {ch: array('d', bytes(8 * self.capacity)) for ch in self.channels}
+        self._head = 0   # next physical slot to write
+        self._count = 0  # number of valid samples
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, t, force):
+        with self._lock:
+            i = self._head
+            self._t[i] = t
+            for ch in self.channels:
+                self._data[ch][i] = force.get(ch, 0.0)
+            self._head = (i + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+
+    def clear(self):
+        with self._lock:
+            self._head = 0
+            self._count = 0
+
+    def _ordered(self, buf, start, n):
+        # copy logical samples [start, start + n) out of the ring, oldest first
+        first = (self._head - self._count + start) % self.capacity
+        end = first + n
+        if end <= self.capacity:
+            return buf[first:end]
+        return buf[first:] + buf[:end - self.capacity]
+
+    def window(self, since=None, channels=None):
+        """Return (t, {channel: values}) for samples newer than `since`."""
+        channels = self.channels if channels is None else tuple(channels)
+        with self._lock:
+            count = self._count
+            oldest = (self._head - count) % self.capacity
+
+            # binary search for the first logical index with t > since
+            lo, hi = 0, count
+            if since is not None:
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if self._t[(oldest + mid) % self.capacity] > since:
+                        hi = mid
+                    else:
+                        lo = mid + 1
+            n = count - lo
+            t = self._ordered(self._t, lo, n)
+            data = {ch: self._ordered(self._data[ch], lo, n) for ch in channels}
+        return t, data
+
+    def query(self, since=None, max_points=None, channels=None):
+        """Window of samples newer than `since`, min/max decimated to `max_points`."""
+        t, data = self.window(since, channels)
+        if max_points and len(t) > max_points:
+            return min_max_decimate(t, data, max_points), True
+        return (t, data), False
+
+
+def min_max_decimate(t, data, max_points):
+    """
+    Reduce a multi-channel series to at most `max_points` samples while
+    keeping every channel's minimum and maximum in each bucket, so peaks
+    (e.g. a pull-off force spike) survive the downsampling.
+    """
+    n = len(t)
+    per_bucket = 2 * max(1, len(data))
+    buckets = (max_points - 1) // per_bucket
+    keep = []
+    if buckets < 1:
+        # too few points for a min/max bucket: evenly spaced samples ending with the newest
+        keep = [(i + 1) * n // max_points - 1 for i in range(max_points)]
+    for b in range(buckets):
+        lo = b * n // buckets
+        hi = (b + 1) * n // buckets
+        if lo >= hi:
+            continue
+        picked = set()
+        for values in data.values():
+            seg = values[lo:hi]
+            picked.add(lo + seg.index(min(seg)))
+            picked.add(lo + seg.index(max(seg)))
+        if b == buckets - 1:
+            picked.add(hi - 1)  # keep the newest sample so clients can resume from it
+        keep.extend(sorted(picked))
+
+    t_out = array('d', (t[i] for i in keep))
+    data_out = {ch: array('d', (values[i] for i in keep)) for ch, values in data.items()}
+    return t_out, data_out
+
+
+def encode_window(t, data, decimated, encoding='f32'):
+    """
+    Serialise a window for the /force_history endpoint.
+
+    Times are sent relative to `t0` so they fit in float32. With the default
+    'f32' encoding every series is a base64 string of little-endian float32
+    values (decode with `new Float32Array(...)` on the client); 'json' sends
+    plain number lists instead.
+    """
+    t0 = t[0] if len(t) else 0.0
+    rel = array('f', (x - t0 for x in t))
+    out = {
+        't0': t0,
+        'latest': t[-1] if len(t) else None,
+        'count': len(t),
+        'decimated': decimated,
+        'encoding': encoding,
+    }
+    series = {'t': rel}
+    series.update({ch: array('f', values) for ch, values in data.items()})
+    for key, values in series.items():
+        if encoding == 'f32':
+            if sys.byteorder != 'little':
+                values.byteswap()
+            out[key] = base64.b64encode(values.tobytes()).decode('ascii')
+        else:
+            out[key] = [round(v, 4) for v in values]
+    return out
+
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Bulk import legacy text run logs into the run catalog.
+
+Each log_*.txt found under the given paths is streamed line by line in a
+worker process and converted to the structured per-run CSV the server now
+writes for every run (see run_data.py); the parent process records the
+runs in the catalog in batches.
+
+    python import_logs.py /data/old_logs --db runs.sqlite3 --out /data/runs
+    python import_logs.py /data/old_logs --skip-existing      # resume a backfill
+    python import_logs.py /data/old_logs --replace            # overwrite runs already cataloged
+
+Runs already in the catalog (e.g. written by the server, with their status,
+rig and capture) are left untouched unless --replace is given.
+    python import_logs.py --bench                             # throughput on synthetic logs
+"""
+
+import argparse
+import datetime
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import run_catalog
+import run_data
+
+BATCH = 200 # runs per catalog transaction
+
+
+def find_logs(paths):
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.startswith('log_') and name.endswith('.txt'):
+                    yield os.path.join(root, name)
+
+
+def convert(job):
+    # runs in a worker process; errors are returned so one bad file doesn't stop the import
+    path, out_dir, rig = job
+    try:
+        run = run_data.convert_log(path, out_dir, status='imported')
+    except Exception as e:
+        return path, None, f'{type(e).__name__}: {e}'
+    run['rig'] = rig
+    return path, run, None
+
+
+def import_logs(paths, db, out_dir=None, workers=None, rig=None, skip_existing=False, replace=False, quiet=False):
+    catalog = run_catalog.RunCatalog(db)
+    logs = list(find_logs(paths))
+    if skip_existing:
+        known = catalog.run_ids()
+        logs = [p for p in logs if run_data.run_id_from_path(p) not in known]
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    total_bytes = sum(os.path.getsize(p) for p in logs)
+    lines = done = failed = kept = 0
+    batch = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = ((p, out_dir, rig) for p in logs)
+        for path, run, error in pool.map(convert, jobs, chunksize=4):
+            if error:
+                failed += 1
+                print(f'  skipped {path}: {error}', file=sys.stderr)
+                continue
+            lines += run.pop('lines')
+            batch.append(run)
+            done += 1
+            if len(batch) >= BATCH:
+                kept += len(batch) - catalog.add_runs(batch, replace=replace)
+                batch = []
+            if not quiet and done % 1000 == 0:
+                print(f'  {done}/{len(logs)} runs')
+    if batch:
+        kept += len(batch) - catalog.add_runs(batch, replace=replace)
+    catalog.close()
+
+    elapsed = time.perf_counter() - started
+    return {'runs': done, 'failed': failed, 'kept': kept, 'lines': lines, 'bytes': total_bytes, 'seconds': elapsed}
+
+
+def report(stats, label=''):
+    s = max(stats['seconds'], 1e-9)
+    print(f"{label}{stats['runs']} runs ({stats['failed']} failed, {stats['kept']} already cataloged), "
+          f"{stats['bytes'] / 1e6:.1f} MB in {s:.2f}s: "
+          f"{stats['bytes'] / 1e6 / s:.1f} MB/s, {stats['lines'] / s:,.0f} lines/s")
+
+
+def write_synthetic_log(path, samples):
+    # same layout write_log() produces
+    t = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    with open(path, 'w') as f:
+        f.write('*************************** TestBed Config ***************************\n')
+        f.write("Force Sensor Calibration Factors: {'Fx': 20.0, 'Fy': 20.0, 'Fz': 20.408163265306122}\n")
+        f.write('*************************** Sequence ***************************\n')
+        f.write("{'X': [], 'Y': [], 'Z': [{'data': {'direction': 'negative', 'stepSize': 1}}]}\n")
+        f.write('*************************** Execution 0 ***************************\n')
+        for i in range(samples):
+            t += datetime.timedelta(milliseconds=80)
+            fx, fy, fz = random.uniform(-2, 2), random.uniform(-2, 2), random.uniform(0, 8)
+            force = {'Fx': round(fx, 2), 'Fy': round(fy, 2), 'Fz': round(fz, 2),
+                     'F_shear': round((fx ** 2 + fy ** 2) ** 0.5, 2)}
+            f.write(f"{t} | {force} | {{'X': 0, 'Y': 0, 'Z': {i}}} \n")
+        f.write('*************************** Experiment 0 Finished ***************************\n')
+
+
+def bench(files, samples, workers):
+    tmp = tempfile.mkdtemp(prefix='import_bench_')
+    try:
+        src = os.path.join(tmp, 'logs')
+        os.makedirs(src)
+        start = datetime.datetime(2024, 1, 1)
+        for i in range(files):
+            stamp = (start + datetime.timedelta(seconds=i)).strftime(run_data.LOG_NAME_TIME)
+            write_synthetic_log(os.path.join(src, f'log_{stamp}.txt'), samples)
+        for n in sorted({1, workers or os.cpu_count() or 1}):
+            db = os.path.join(tmp, f'runs_{n}.sqlite3')
+            out = os.path.join(tmp, f'out_{n}')
+            report(import_logs([src], db, out, workers=n, quiet=True), label=f'{n:>3} workers: ')
+    finally:
+        shutil.rmtree(tmp)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', help='log files or directories to search for log_*.txt')
+    parser.add_argument('--db', default='runs.sqlite3', help='run catalog to add the runs to')
+    parser.add_argument('--out', help='directory for the converted CSVs (default: next to each log)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: all CPUs)')
+    parser.add_argument('--rig', help='rig name to record for the imported runs')
+    parser.add_argument('--skip-existing', action='store_true', help='skip runs already in the catalog')
+    parser.add_argument('--replace', action='store_true', help='overwrite runs already in the catalog')
+    parser.add_argument('--bench', action='store_true', help='measure throughput on synthetic logs instead')
+    parser.add_argument('--bench-files', type=int, default=32)
+    parser.add_argument('--bench-samples', type=int, default=50000, help='sample lines per synthetic log')
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench_files, args.bench_samples, args.workers)
+        return
+    if not args.paths:
+        parser.error('no paths given')
+    report(import_logs(args.paths, args.db, args.out, args.workers, args.rig, args.skip_existing, args.replace))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+Streaming jog: velocity set-points in, step pulses out.
+
+Clients stream set-points {axis: -1..1 of full speed} over Socket.IO while a
+jog control is held. JogController applies them to one persistent motion
+thread that ramps every axis toward its target speed and generates the
+steps with a phase accumulator. If no set-point arrives for `deadman`
+seconds the targets drop to zero (dead-man), and whenever `blocked()` is
+true (emergency stop, sequence running) all axes stop at once and the jog
+stays latched until the client sends a zero set-point.
+
+Latency is tracked per set-point: apply_ms is arrival to the motion tick
+that applied it, first_step_ms is arrival to the first step edge of a
+set-point that starts motion from rest, rtt_ms are the command round trips
+clients measured and reported back.
+"""
+
+import collections
+import threading
+import time
+
+MAX_STEPS_S = 500 # full-scale speed, matches the 1 ms high / 1 ms low /start loop
+ACCEL_STEPS_S2 = 4000 # full speed to standstill in 125 ms
+DEADMAN_S = 0.25 # set-points are expected every ~20 ms while a control is held
+TICK_S = 0.0005
+STATUS_INTERVAL = 0.05 # min seconds between on_steps() calls
+
+
+class LatencyStats:
+    """Most recent latency samples in ms."""
+
+    def __init__(self, size=500):
+        self.samples = collections.deque(maxlen=size)
+
+    def add(self, ms):
+        self.samples.append(ms)
+
+    def summary(self):
+        s = sorted(self.samples)
+        if not s:
+            return {'count': 0}
+        pick = lambda q: round(s[min(len(s) - 1, int(q * len(s)))], 3)
+        return {'count': len(s), 'p50': pick(0.5), 'p95': pick(0.95), 'max': round(s[-1], 3)}
+
+
+class JogController:
+    def __init__(self, axes, step, blocked=lambda: False, on_ack=None, on_steps=None,
+                 max_speed=MAX_STEPS_S, accel=ACCEL_STEPS_S2, deadman=DEADMAN_S):
+        # step(axis, forward) issues one pulse; on_ack(sid, ack) and on_steps()
+        # are called from the motion thread, outside the lock
+        self.axes = tuple(axes)
+        self.max_speed = max_speed
+        self.accel = accel
+        self.deadman = deadman
+        self._step = step
+        self._blocked = blocked
+        self._on_ack = on_ack
+        self._on_steps = on_steps
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._target = self._zeros() # steps/s
+        self._velocity = self._zeros() # steps/s, ramped toward _target
+        self._phase = self._zeros() # fractional steps not yet issued
+        self._last_setpoint = 0.0
+        self._applied = None # (seq, sid, received) of the newest set-point, until applied
+        self._starting = None # (seq, sid, received) of a start from rest, until its first step
+        self._thread = None
+        self.owner = None # sid of the client that sent the last set-point
+        self.latched = False
+        self.deadman_trips = 0
+        self.apply_ms = LatencyStats()
+        self.first_step_ms = LatencyStats()
+        self.rtt_ms = LatencyStats()
+
+    def _zeros(self):
+        return {ax: 0.0 for ax in self.axes}
+
+    def _idle(self):
+        # with the lock held
+        return not self.latched and not any(self._target.values()) and not any(self._velocity.values())
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def idle(self):
+        with self._lock:
+            return self._idle()
+
+    def set_point(self, velocities, seq=None, sid=None, rtt_ms=None):
+        """Apply {axis: -1..1}; returns False if rejected because the jog is latched."""
+        received = time.perf_counter()
+        if rtt_ms is not None:
+            self.rtt_ms.add(float(rtt_ms))
+        target = {ax: max(-1.0, min(1.0, float(velocities.get(ax) or 0))) * self.max_speed
+                  for ax in self.axes}
+        moving = any(target.values())
+        with self._lock:
+            if self._blocked() and not self._idle():
+                self._halt()
+            if self.latched:
+                if moving:
+                    return False
+                self.latched = False # released, the next press may move again
+            if moving and not any(self._velocity.values()) and self._starting is None:
+                self._starting = (seq, sid, received)
+            elif not moving:
+                self._starting = None
+            self._target = target
+            self._last_setpoint = received
+            self._applied = (seq, sid, received)
+            self.owner = sid
+        self._wake.set()
+        return True
+
+    def release(self, sid=None):
+        """Ramp every axis down, e.g. when the jogging client disconnects."""
+        with self._lock:
+            if sid is None or sid == self.owner:
+                self._target = self._zeros()
+
+    def _halt(self):
+        # with the lock held: stop without ramping and latch until released
+        self._target = self._zeros()
+        self._velocity = self._zeros()
+        self._phase = self._zeros()
+        self._starting = None
+        self.latched = True
+
+    def stats(self):
+        with self._lock:
+            velocity = {ax: round(v, 1) for ax, v in self._velocity.items()}
+        return {'apply_ms': self.apply_ms.summary(), 'first_step_ms': self.first_step_ms.summary(),
+                'rtt_ms': self.rtt_ms.summary(), 'deadman_trips': self.deadman_trips,
+                'latched': self.latched, 'velocity': velocity,
+                'max_speed': self.max_speed, 'accel': self.accel, 'deadman': self.deadman}
+
+    def _run(self):
+        last = last_status = time.perf_counter()
+        stepped = False
+        while True:
+            now = time.perf_counter()
+            dt = min(now - last, 0.01) # don't burst steps after a stall
+            last = now
+            acks = []
+            steps = []
+            with self._lock:
+                if self._blocked():
+                    if not self._idle():
+                        self._halt()
+                elif any(self._target.values()) and now - self._last_setpoint > self.deadman:
+                    self._target = self._zeros()
+                    self.deadman_trips += 1
+                if self._applied:
+                    seq, sid, received = self._applied
+                    self._applied = None
+                    ms = (now - received) * 1000
+                    self.apply_ms.add(ms)
+                    acks.append((sid, {'seq': seq, 'apply_ms': round(ms, 3)}))
+                for ax in self.axes:
+                    target, v = self._target[ax], self._velocity[ax]
+                    if v == 0 and target:
+                        # starting from rest: step right away instead of after the ramp
+                        self._phase[ax] = 1.0 if target > 0 else -1.0
+                    dv = self.accel * dt
+                    v = min(v + dv, target) if target > v else max(v - dv, target)
+                    self._velocity[ax] = v
+                    phase = self._phase[ax] + v * dt
+                    while abs(phase) >= 1:
+                        forward = phase > 0
+                        steps.append((ax, forward))
+                        phase -= 1 if forward else -1
+                    self._phase[ax] = phase if v or target else 0.0
+                starting = self._starting if steps else None
+                if starting:
+                    self._starting = None
+                idle = self._idle()
+
+            for ax, forward in steps:
+                self._step(ax, forward)
+            if starting:
+                seq, sid, received = starting
+                ms = (time.perf_counter() - received) * 1000
+                self.first_step_ms.add(ms)
+                acks.append((sid, {'seq': seq, 'first_step_ms': round(ms, 3)}))
+            if self._on_ack:
+                for sid, ack in acks:
+                    self._on_ack(sid, ack)
+            stepped = stepped or bool(steps)
+            if stepped and self._on_steps and (idle or now - last_status >= STATUS_INTERVAL):
+                self._on_steps()
+                stepped = False
+                last_status = now
+
+            if idle:
+                self._wake.wait()
+                self._wake.clear()
+                last = time.perf_counter()
+            else:
+                time.sleep(TICK_S)
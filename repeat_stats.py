@@ -0,0 +1,230 @@
+"""
+Running force-vs-displacement statistics across the repeats of a sequence.
+
+While a repeat executes its force samples are collected with the step
+counts. When it finishes, every sample is placed by its position along the
+path travelled so far (cumulative |steps| over all axes), so an approach
+and the retract that follows land in different bins and the loading /
+unloading loop survives. Samples taken during a force hold are left out
+and the hold's back-and-forth correction steps don't count as path, so
+what follows a hold stays on the same grid points in every repeat;
+samples taken while nothing moved are left out too. The samples are binned onto a common
+path grid (samples in the same bin are averaged, empty bins inside the
+travelled range are linearly interpolated) and folded into a per-grid-point
+running mean/variance (Welford), so the aggregate takes O(grid points)
+memory however many repeats run. The grid is fixed by the first repeat's
+path length; each grid point also carries the mean step count of the
+displacement axis ('position') to plot the curves against.
+
+A channel has converged once every grid point seen by at least two repeats
+has a standard error of the mean below `sem` and at least `min_repeats`
+repeats are in.
+"""
+
+from array import array
+import csv
+import math
+import threading
+
+CHANNELS = ('Fx', 'Fy', 'Fz', 'F_shear')
+POSITION = 'position' # mean step count of the displacement axis at each grid point
+GRID_POINTS = 200
+CONVERGENCE_CHANNEL = 'Fz'
+CONVERGENCE_SEM = 0.05 # Newtons
+MIN_REPEATS = 5
+
+
+def parse_options(aggregate, axes):
+    """
+    Validate the optional 'aggregate' object of a posted sequence. Returns
+    (RepeatAggregator kwargs, stop_when_converged); raises ValueError.
+    """
+    aggregate = aggregate or {}
+    if not isinstance(aggregate, dict):
+        raise ValueError('aggregate must be an object')
+    axis = aggregate.get('axis')
+    if axis is not None and axis not in axes:
+        raise ValueError(f'unknown aggregate axis: {axis}')
+    channel = aggregate.get('channel', CONVERGENCE_CHANNEL)
+    if channel not in CHANNELS:
+        raise ValueError(f'unknown aggregate channel: {channel}')
+    try:
+        points = int(aggregate.get('points', GRID_POINTS))
+        sem = float(aggregate.get('sem', CONVERGENCE_SEM))
+        min_repeats = int(aggregate.get('minRepeats', MIN_REPEATS))
+    except (TypeError, ValueError):
+        raise ValueError('aggregate points, sem and minRepeats must be numbers')
+    if not 2 <= points <= 10000 or not sem > 0 or min_repeats < 2:
+        raise ValueError('aggregate needs 2 <= points <= 10000, sem > 0 and minRepeats >= 2')
+    stop = aggregate.get('stopWhenConverged', False) in (True, 'True')
+    return {'axis': axis, 'points': points, 'channel': channel, 'sem': sem, 'min_repeats': min_repeats}, stop
+
+
+class RunningStats:
+    """Welford mean/variance for every point of a grid."""
+
+    def __init__(self, size):
+        self.n = array('l', bytes(array('l').itemsize * size))
+        self.mean = array('d', bytes(8 * size))
+        self.m2 = array('d', bytes(8 * size))
+
+    def add(self, values):
+        # values: one per grid point, NaN where this repeat has no data
+        for i, x in enumerate(values):
+            if math.isnan(x):
+                continue
+            n = self.n[i] + 1
+            delta = x - self.mean[i]
+            mean = self.mean[i] + delta / n
+            self.m2[i] += delta * (x - mean)
+            self.mean[i] = mean
+            self.n[i] = n
+
+    def std(self, i):
+        n = self.n[i]
+        return math.sqrt(self.m2[i] / (n - 1)) if n > 1 else None
+
+    def max_sem(self):
+        sems = [self.std(i) / math.sqrt(self.n[i]) for i in range(len(self.n)) if self.n[i] > 1]
+        return max(sems) if sems else None
+
+
+class RepeatAggregator:
+    def __init__(self, axis=None, points=GRID_POINTS, channel=CONVERGENCE_CHANNEL,
+                 sem=CONVERGENCE_SEM, min_repeats=MIN_REPEATS, channels=CHANNELS):
+        self.axis = axis # None => the axis with the most travel in the first repeat
+        self.points = max(int(points), 2)
+        self.channel = channel
+        self.sem = float(sem)
+        self.min_repeats = int(min_repeats)
+        self.channels = tuple(channels)
+        self.repeats = 0
+        self.grid_step = None # path steps between grid points, set by the first repeat
+        self.stats = {ch: RunningStats(self.points) for ch in self.channels + (POSITION,)}
+        self._lock = threading.Lock()
+        self._samples = None # list of (step counts, force, holding) while a repeat is collecting
+
+    def begin_repeat(self):
+        with self._lock:
+            self._samples = []
+
+    def add_sample(self, steps, force, holding=False):
+        with self._lock:
+            if self._samples is not None:
+                self._samples.append((steps, force, holding))
+
+    def end_repeat(self):
+        """Fold the finished repeat into the statistics; False if nothing moved."""
+        with self._lock:
+            samples, self._samples = self._samples, None
+        if not samples:
+            return False
+        if self.axis is None:
+            self.axis = max(samples[0][0], key=lambda ax: travel(samples, ax))
+        path = along_path(samples, self.axis)
+        if len(path) < 2:
+            return False
+        if self.grid_step is None:
+            self.grid_step = max(path[-1][0], 1) / (self.points - 1)
+        for key, values in self._binned(path).items():
+            self.stats[key].add(values)
+        self.repeats += 1
+        return True
+
+    def _binned(self, path):
+        keys = self.channels + (POSITION,)
+        sums = {key: [0.0] * self.points for key in keys}
+        counts = [0] * self.points
+        for s, position, force in path:
+            i = round(s / self.grid_step)
+            if i >= self.points:
+                break # beyond the first repeat's path length
+            counts[i] += 1
+            for ch in self.channels:
+                sums[ch][i] += force.get(ch, 0.0)
+            sums[POSITION][i] += position
+        filled = [i for i, c in enumerate(counts) if c]
+        out = {}
+        for key in keys:
+            values = [s / c if c else math.nan for s, c in zip(sums[key], counts)]
+            # interpolate the gaps between filled bins, leave the untravelled end empty
+            for a, b in zip(filled, filled[1:]):
+                for i in range(a + 1, b):
+                    w = (i - a) / (b - a)
+                    values[i] = values[a] + w * (values[b] - values[a])
+            out[key] = values
+        return out
+
+    def max_sem(self):
+        return self.stats[self.channel].max_sem() if self.channel in self.stats else None
+
+    def converged(self):
+        max_sem = self.max_sem()
+        return self.repeats >= self.min_repeats and max_sem is not None and max_sem <= self.sem
+
+    def grid_values(self):
+        if self.grid_step is None:
+            return []
+        return [i * self.grid_step for i in range(self.points)]
+
+    def as_dict(self):
+        """JSON-ready summary; points no repeat has reached are null."""
+        series = {}
+        for key, st in self.stats.items():
+            series[key] = {
+                'n': list(st.n),
+                'mean': [round(m, 4) if n else None for m, n in zip(st.mean, st.n)],
+                'std': [round(st.std(i), 4) if st.n[i] > 1 else None for i in range(self.points)],
+            }
+        max_sem = self.max_sem()
+        return {
+            'repeats': self.repeats,
+            'axis': self.axis,
+            'path': [round(s, 3) for s in self.grid_values()], # grid, steps travelled over all axes
+            'position': series.pop(POSITION),
+            'channels': series,
+            'convergence': {'channel': self.channel, 'sem': self.sem, 'min_repeats': self.min_repeats,
+                            'max_sem': round(max_sem, 4) if max_sem is not None else None,
+                            'converged': self.converged()},
+        }
+
+    def write_csv(self, path):
+        keys = (POSITION,) + self.channels
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['path_steps'] + [f'{key}_{k}' for key in keys for k in ('n', 'mean', 'std')])
+            for i, s in enumerate(self.grid_values()):
+                row = [f'{s:.3f}']
+                for key in keys:
+                    st = self.stats[key]
+                    row += [st.n[i], f'{st.mean[i]:.4f}' if st.n[i] else '',
+                            f'{st.std(i):.4f}' if st.n[i] > 1 else '']
+                writer.writerow(row)
+
+
+def travel(samples, axis):
+    d = [sample[0][axis] for sample in samples]
+    return max(d) - min(d)
+
+
+def along_path(samples, axis):
+    """
+    [(path steps, axis position, force)]. Hold samples are skipped and the
+    steps taken during a hold are not counted as path; samples taken while
+    nothing moved are skipped too.
+    """
+    out = []
+    s = 0
+    prev = None
+    for steps, force, holding in samples:
+        if holding:
+            prev = steps # the next sample's path continues from where the hold left off
+            continue
+        if prev is not None:
+            moved = sum(abs(steps[ax] - prev[ax]) for ax in steps)
+            if not moved:
+                continue
+            s += moved
+        prev = steps
+        out.append((s, steps[axis], force))
+    return out
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Replay a raw sensor capture through app.py without the rig.
+
+Captures are written next to each run log as log_<timestamp>.rawcap while
+RAW_CAPTURE is on. GPIO is simulated (see sim_hardware.py) and the serial
+port is replaced by a ReplaySerial, so frames go through the real
+read_force() and, with --sequence, the real force poller and sequence
+executor.
+
+    python replay.py log_2025-07-01__10-00-00.rawcap
+    python replay.py CAPTURE --sequence seq.json --speed 1
+    python replay.py CAPTURE --speed 0 --profile
+
+Logs, CSVs and the run catalog of a replayed sequence are written to --out
+(a new temporary directory by default), never next to the server's runs.
+
+--speed 1 reproduces the recorded timing; larger values replay faster and
+scale motion pulse timing by the same factor, 0 runs as fast as possible.
+With a sequence, --speed 0 runs motion and sensor on one virtual clock
+(see sensor_capture.ReplayClock): frames are released as the simulated
+pulses and pauses add up, so replaying a capture twice gives the same
+trigger points and log. Durations measured by hold triggers are
+wall-clock, so sequences using duration triggers are only faithful at
+--speed 1.
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+
+import sim_hardware
+from sensor_capture import ReplayClock, ReplaySerial, ReplayFinished
+
+
+def replay_frames(app):
+    # decode every frame through read_force and summarise what the sensor saw
+    frames = invalid = 0
+    peaks = {}
+    while True:
+        try:
+            force = app.read_force()
+        except ReplayFinished:
+            break
+        if force is None:
+            invalid += 1
+            continue
+        frames += 1
+        for ch, value in force.items():
+            lo, hi = peaks.get(ch, (value, value))
+            peaks[ch] = (min(lo, value), max(hi, value))
+    return frames, invalid, peaks
+
+
+def replay_sequence(app, sequence, clock=None):
+    finished = threading.Event()
+
+    def poll():
+        try:
+            app.force_poller()
+        except ReplayFinished:
+            finished.set()
+        finally:
+            if clock is not None:
+                clock.close() # motion must not wait for a reader that is gone
+        if finished.is_set() and app.sequence_running:
+            print("Capture ended before the sequence completed, stopping.")
+            app.stop_motion()
+
+    threading.Thread(target=poll, daemon=True).start()
+    app.run_dynamic_sequence(sequence)
+    return finished.is_set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('capture', help='.rawcap file written during a run')
+    parser.add_argument('--speed', type=float, default=1.0, help='1 = recorded timing, 0 = as fast as possible')
+    parser.add_argument('--sequence', help='sequence JSON (as posted to /run_sequence) to execute against the capture')
+    parser.add_argument('--profile', action='store_true', help='print the hottest functions afterwards')
+    parser.add_argument('--out', help='directory for the replay\'s logs and run catalog (default: a new temporary one)')
+    args = parser.parse_args()
+    capture = os.path.abspath(args.capture)
+    sequence_path = args.sequence and os.path.abspath(args.sequence)
+
+    sim_hardware.install()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if args.sequence:
+        # app writes run files and runs.sqlite3 to the working directory
+        out = args.out or tempfile.mkdtemp(prefix='replay_')
+        os.makedirs(out, exist_ok=True)
+        os.chdir(out)
+    import app
+
+    app.RAW_CAPTURE = False # don't capture the replay itself
+    clock = ReplayClock() if args.sequence and not args.speed else None
+    # the capture is the primary sensor's; other configured sensors stay silent
+    app.sensor_manager.primary.ser = ReplaySerial(capture, speed=args.speed, clock=clock)
+    sim_hardware.mark_ready(app)
+    if clock is not None:
+        def motion_sleep(seconds):
+            if app.abort_motion.is_set():
+                return False
+            clock.advance(seconds)
+            return not app.abort_motion.is_set()
+        app.motion_sleep = motion_sleep
+        app.poller_sleep = clock.sleep
+    elif args.speed and args.speed != 1:
+        # keep motion timing in proportion to the replayed sensor timing
+        scale = args.speed
+        app.motion_sleep = lambda s: not app.abort_motion.wait(s / scale)
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    started = time.perf_counter()
+
+    if args.sequence:
+        with open(sequence_path) as f:
+            sequence = json.load(f)
+        exhausted = replay_sequence(app, sequence, clock)
+        elapsed = time.perf_counter() - started
+        counts = app.step_counts_snapshot()
+        print(f"Sequence finished in {elapsed:.2f}s, log written to {os.path.abspath(app.log_f_name)}")
+        print(f"Final steps: X {counts['X']} | Y {counts['Y']} | Z {counts['Z']}"
+              + (" (capture exhausted)" if exhausted else ""))
+    else:
+        frames, invalid, peaks = replay_frames(app)
+        elapsed = time.perf_counter() - started
+        print(f"{frames} frames ({invalid} invalid) in {elapsed:.2f}s, {frames / max(elapsed, 1e-9):.0f} frames/s")
+        for ch, (lo, hi) in sorted(peaks.items()):
+            print(f"  {ch:>8}: min {lo:8.2f}  max {hi:8.2f}")
+
+    if profiler:
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+
+
+if __name__ == '__main__':
+    main()
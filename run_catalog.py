@@ -0,0 +1,144 @@
+"""
+SQLite index of experiment runs.
+
+One row per run with its timestamps, sequence hash, calibration factors,
+rig, summary metrics and the location of its files, so runs can be
+listed, filtered and fetched with an indexed query instead of scanning
+the log directory.
+"""
+
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id        TEXT PRIMARY KEY,  -- log file stem, e.g. log_2025-07-01__10-00-00
+    started_at    REAL NOT NULL,     -- epoch seconds
+    finished_at   REAL,
+    status        TEXT NOT NULL,     -- completed | converged | stopped | failed | imported
+    sequence_hash TEXT,
+    calibration   TEXT,              -- JSON calibration factors
+    rig           TEXT,
+    repeats       INTEGER,
+    samples       INTEGER,
+    min_fz        REAL,
+    max_fz        REAL,
+    max_shear     REAL,
+    log_path      TEXT NOT NULL,
+    capture_path  TEXT,
+    data_path     TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_time     ON runs (started_at);
+CREATE INDEX IF NOT EXISTS runs_by_sequence ON runs (sequence_hash, started_at);
+CREATE INDEX IF NOT EXISTS runs_by_rig      ON runs (rig, started_at);
+CREATE INDEX IF NOT EXISTS runs_by_status   ON runs (status, started_at);
+CREATE INDEX IF NOT EXISTS runs_by_max_fz   ON runs (max_fz);
+"""
+
+COLUMNS = ('run_id', 'started_at', 'finished_at', 'status', 'sequence_hash', 'calibration',
+           'rig', 'repeats', 'samples', 'min_fz', 'max_fz', 'max_shear',
+           'log_path', 'capture_path', 'data_path')
+
+# query parameter -> SQL condition, all backed by the indexes above
+FILTERS = {
+    'since': 'started_at >= ?',
+    'until': 'started_at < ?',
+    'sequence_hash': 'sequence_hash = ?',
+    'rig': 'rig = ?',
+    'status': 'status = ?',
+    'min_max_fz': 'max_fz >= ?',
+}
+
+
+def sequence_hash(sequence):
+    """Stable hash of a sequence definition, independent of key order."""
+    text = json.dumps(sequence, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+class RunStats:
+    """Running summary of the force samples of one run, O(1) memory."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.samples = 0
+        self.min_fz = math.inf
+        self.max_fz = -math.inf
+        self.max_shear = -math.inf
+
+    def update(self, force):
+        self.samples += 1
+        fz = force.get('Fz', 0.0)
+        self.min_fz = min(self.min_fz, fz)
+        self.max_fz = max(self.max_fz, fz)
+        self.max_shear = max(self.max_shear, force.get('F_shear', 0.0))
+
+    def as_dict(self):
+        if not self.samples:
+            return {'samples': 0, 'min_fz': None, 'max_fz': None, 'max_shear': None}
+        return {'samples': self.samples, 'min_fz': self.min_fz,
+                'max_fz': self.max_fz, 'max_shear': self.max_shear}
+
+
+class RunCatalog:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock:
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.executescript(SCHEMA)
+
+    def add_run(self, **run):
+        unknown = set(run) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f'unknown run fields: {sorted(unknown)}')
+        self.add_runs([run])
+
+    def add_runs(self, runs, replace=True):
+        """
+        Insert many runs in one transaction. Existing rows are replaced, or
+        kept as they are with replace=False. Returns the number of rows written.
+        """
+        rows = [tuple(run.get(col) for col in COLUMNS) for run in runs]
+        placeholders = ', '.join('?' for _ in COLUMNS)
+        verb = 'INSERT OR REPLACE' if replace else 'INSERT OR IGNORE'
+        with self._lock, self._db:
+            cursor = self._db.executemany(
+                f'{verb} INTO runs ({", ".join(COLUMNS)}) VALUES ({placeholders})', rows)
+            return cursor.rowcount
+
+    def get_run(self, run_id):
+        with self._lock:
+            row = self._db.execute('SELECT * FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def run_ids(self):
+        with self._lock:
+            return {row[0] for row in self._db.execute('SELECT run_id FROM runs')}
+
+    def list_runs(self, filters=None, limit=50, offset=0):
+        """Newest first. Returns (total matching, [run dicts])."""
+        conditions, args = [], []
+        for key, value in (filters or {}).items():
+            if key not in FILTERS:
+                raise ValueError(f'unknown filter: {key}')
+            conditions.append(FILTERS[key])
+            args.append(value)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        with self._lock:
+            total = self._db.execute(f'SELECT COUNT(*) FROM runs {where}', args).fetchone()[0]
+            rows = self._db.execute(
+                f'SELECT * FROM runs {where} ORDER BY started_at DESC LIMIT ? OFFSET ?',
+                args + [limit, offset]).fetchall()
+        return total, [dict(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
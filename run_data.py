@@ -0,0 +1,145 @@
+"""
+Structured per-run data converted from the text run logs.
+
+write_log() produces human readable logs of the form
+
+    <timestamp> | {'Fx': .., 'Fy': .., 'Fz': .., 'F_shear': ..} | {'X': .., 'Y': .., 'Z': ..}
+    <timestamp> | {force dict} | {step counts} | {'main:Fx': .., 'pad2:Fz': .., ...}
+    <timestamp> | {force dict} | Axis Z: Fz (N) ≥ 5, movement break trigger fired.
+    *************************** Execution 0 ***************************
+
+convert_log() streams such a log line by line and writes <run_id>.csv next
+to it (one row per force sample or event, columns in CSV_COLUMNS), and
+returns the run's catalog fields. The server converts every run it
+finishes and import_logs.py backfills old logs the same way.
+"""
+
+import ast
+import csv
+import datetime
+import os
+import re
+
+from run_catalog import RunStats, sequence_hash
+
+# 'channels' holds the time-aligned channels of all sensors on rigs with more than one
+CSV_COLUMNS = ('t', 'execution', 'kind', 'Fx', 'Fy', 'Fz', 'F_shear', 'X', 'Y', 'Z', 'message', 'channels')
+FORCE_KEYS = ('Fx', 'Fy', 'Fz', 'F_shear')
+STEP_KEYS = ('X', 'Y', 'Z')
+
+BANNER = re.compile(r'^\*+ (.+?) \*+$')
+LOG_NAME_TIME = '%Y-%m-%d__%H-%M-%S'
+CALIBRATION_PREFIX = 'Force Sensor Calibration Factors: '
+
+
+def parse_flat_dict(text):
+    """
+    Parse the repr of a flat str -> number dict, e.g. "{'Fx': 0.1, 'Fz': -2}".
+    Much faster than ast.literal_eval for the millions of sample lines.
+    """
+    out = {}
+    body = text.strip()[1:-1]
+    if not body:
+        return out
+    for item in body.split(', '):
+        key, _, value = item.partition(': ')
+        out[key.strip("'\"")] = float(value)
+    return out
+
+
+def run_id_from_path(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def started_at_from_name(run_id):
+    try:
+        stamp = run_id.split('_', 1)[1]
+        return datetime.datetime.strptime(stamp, LOG_NAME_TIME).timestamp()
+    except (IndexError, ValueError):
+        return None
+
+
+def convert_log(log_path, out_dir=None, status='completed'):
+    """Write the run's CSV and return its catalog fields plus the number of 'lines' read."""
+    run_id = run_id_from_path(log_path)
+    data_path = os.path.join(out_dir or os.path.dirname(os.path.abspath(log_path)), run_id + '.csv')
+
+    stats = RunStats()
+    calibration = seq_hash = None
+    execution = -1
+    executions = 0
+    first_t = last_t = None
+    in_sequence = False
+    lines = 0
+
+    with open(log_path, encoding='utf-8', errors='replace') as src, \
+            open(data_path, 'w', newline='', encoding='utf-8') as dst:
+        writer = csv.writer(dst)
+        writer.writerow(CSV_COLUMNS)
+        for line in src:
+            lines += 1
+            line = line.rstrip('\n')
+
+            banner = BANNER.match(line)
+            if banner:
+                title = banner.group(1)
+                in_sequence = title == 'Sequence'
+                if title.startswith('Execution '):
+                    execution = int(title.split()[1])
+                    executions += 1
+                continue
+
+            if in_sequence:
+                # the line after the Sequence banner is str(sequence)
+                in_sequence = False
+                try:
+                    seq_hash = sequence_hash(ast.literal_eval(line))
+                except (ValueError, SyntaxError):
+                    pass
+                continue
+
+            if line.startswith(CALIBRATION_PREFIX):
+                calibration = line[len(CALIBRATION_PREFIX):].replace("'", '"')
+                continue
+
+            parts = line.split(' | ', 2)
+            if len(parts) < 3:
+                continue # e.g. "Holding force: ..." notices without timestamp
+            try:
+                t = datetime.datetime.fromisoformat(parts[0]).timestamp()
+                force = parse_flat_dict(parts[1])
+            except ValueError:
+                continue
+            if first_t is None:
+                first_t = t
+            last_t = t
+
+            rest = parts[2].strip()
+            row = [f'{t:.6f}', execution]
+            forces = [force.get(k, '') for k in FORCE_KEYS]
+            if rest.startswith('{'):
+                steps, _, channels = rest.partition(' | ')
+                try:
+                    steps = parse_flat_dict(steps)
+                except ValueError:
+                    continue
+                stats.update(force)
+                row += ['sample'] + forces + [int(steps.get(k, 0)) for k in STEP_KEYS] + ['', channels.strip()]
+            else:
+                row += ['event'] + forces + ['', '', '', rest, '']
+            writer.writerow(row)
+
+    summary = stats.as_dict()
+    return {
+        'run_id': run_id,
+        'started_at': started_at_from_name(run_id) or first_t or os.path.getmtime(log_path),
+        'finished_at': last_t,
+        'status': status,
+        'sequence_hash': seq_hash,
+        'calibration': calibration,
+        'repeats': executions or None,
+        'log_path': os.path.abspath(log_path),
+        'data_path': os.path.abspath(data_path),
+        **summary,
+        'lines': lines,
+    }
@@ -0,0 +1,224 @@
+"""
+Raw force sensor stream capture and replay.
+
+RecordingSerial wraps the real serial port and, while a capture is open,
+appends every chunk read from (and every command written to) the sensor
+to a capture file with its arrival time. ReplaySerial is a drop-in port
+that plays such a file back so read_force() and the sequence executor see
+the exact bytes of a recorded session.
+
+Capture file layout:
+
+    b'GKRAW1\\n'                          magic / version
+    <dBH  t, direction, length  + bytes   one record per chunk
+
+`t` is the arrival time in epoch seconds, `direction` is RX (sensor to
+host) or TX (host to sensor).
+"""
+
+import struct
+import threading
+import time
+
+MAGIC = b'GKRAW1\n'
+RECORD = struct.Struct('<dBH')
+RX, TX = 0, 1
+
+
+class CaptureWriter:
+    def __init__(self, path):
+        self.path = path
+        self._f = open(path, 'wb')
+        self._f.write(MAGIC)
+        self._lock = threading.Lock()
+
+    def record(self, t, direction, data):
+        with self._lock:
+            if self._f is None:
+                return
+            # chunks longer than a record can hold are split
+            for i in range(0, len(data), 0xFFFF):
+                chunk = data[i:i + 0xFFFF]
+                self._f.write(RECORD.pack(t, direction, len(chunk)))
+                self._f.write(chunk)
+
+    def close(self):
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+
+
+def read_capture(path):
+    """Yield (t, direction, data) records from a capture file."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not a raw sensor capture')
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            t, direction, length = RECORD.unpack(header)
+            data = f.read(length)
+            if len(data) < length:
+                return # truncated by a crash mid-write
+            yield t, direction, data
+
+
+class RecordingSerial:
+    """Pass-through serial port that tees traffic into the open capture, if any."""
+
+    def __init__(self, port):
+        self._port = port
+        self._capture = None
+
+    def start_capture(self, path):
+        self.stop_capture()
+        self._capture = CaptureWriter(path)
+
+    def stop_capture(self):
+        capture, self._capture = self._capture, None
+        if capture is not None:
+            capture.close()
+            return capture.path
+        return None
+
+    def read(self, size=1):
+        data = self._port.read(size)
+        capture = self._capture
+        if data and capture is not None:
+            capture.record(time.time(), RX, data)
+        return data
+
+    def write(self, data):
+        capture = self._capture
+        if capture is not None:
+            capture.record(time.time(), TX, data)
+        return self._port.write(data)
+
+    def __getattr__(self, name):
+        # in_waiting, close, reset_input_buffer, ... go to the real port
+        return getattr(self._port, name)
+
+
+class ReplayClock:
+    """
+    Shared virtual time for as-fast-as-possible replays.
+
+    Motion advances it by the pulse and pause lengths it would have slept,
+    the replayed port releases each record once the clock has reached its
+    recorded offset and the force poller sleeps on it too. advance() only
+    returns once the reader is waiting for a later time, i.e. every frame
+    due by then has been read and handled, so the sensor and the motors
+    share one timeline and a replay is repeatable. With several axes
+    moving at once each one advances the clock, so only sequences moving
+    one axis at a time are exactly repeatable.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self._cond = threading.Condition()
+        self._reader_waiting = False
+        self._closed = False
+
+    def _wait(self, t):
+        # with the condition held; reader side (the replayed port, the poller's sleep)
+        while self.now < t and not self._closed:
+            self._reader_waiting = True
+            self._cond.notify_all()
+            self._cond.wait()
+        self._reader_waiting = False
+
+    def wait_until(self, t):
+        with self._cond:
+            self._wait(t)
+
+    def sleep(self, seconds):
+        with self._cond:
+            self._wait(self.now + seconds)
+
+    def _caught_up(self):
+        # with the condition held: wait until the reader has handled everything due
+        while not self._reader_waiting and not self._closed:
+            self._cond.wait()
+
+    def advance(self, seconds):
+        with self._cond:
+            self._caught_up() # never move time while the reader is mid-frame
+            self.now += seconds
+            self._reader_waiting = False
+            self._cond.notify_all()
+            self._caught_up()
+
+    def close(self):
+        # the reader is gone (capture exhausted), stop waiting for it
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class ReplayFinished(Exception):
+    """Raised by ReplaySerial.read() once the capture is exhausted."""
+
+
+class ReplaySerial:
+    """
+    Serial port stand-in that plays back the RX side of a capture.
+
+    With speed=1.0 bytes become readable at their recorded arrival times
+    relative to the first read, speed=10 replays ten times faster and
+    speed=0 hands them out as fast as they are read, or, given a
+    ReplayClock, once the clock reaches their recorded offset. Writes are
+    accepted and dropped.
+    """
+
+    def __init__(self, path, speed=1.0, clock=None):
+        self.path = path
+        self.speed = speed
+        self.clock = clock
+        self._records = ((t, data) for t, direction, data in read_capture(path) if direction == RX)
+        self._buf = bytearray()
+        self._t_first = None
+        self._t_start = None
+        self.bytes_read = 0
+
+    def _next_record(self):
+        # pull the next record into the buffer, waiting for its arrival time
+        try:
+            t, data = next(self._records)
+        except StopIteration:
+            return False
+        if self._t_first is None:
+            self._t_first, self._t_start = t, time.monotonic()
+        if self.clock is not None:
+            self.clock.wait_until(t - self._t_first)
+        elif self.speed:
+            delay = (t - self._t_first) / self.speed - (time.monotonic() - self._t_start)
+            if delay > 0:
+                time.sleep(delay)
+        self._buf += data
+        return True
+
+    def read(self, size=1):
+        while len(self._buf) < size:
+            if not self._next_record():
+                if self._buf:
+                    break
+                raise ReplayFinished(self.path)
+        data = bytes(self._buf[:size])
+        del self._buf[:size]
+        self.bytes_read += len(data)
+        return data
+
+    @property
+    def in_waiting(self):
+        return len(self._buf)
+
+    def write(self, data):
+        return len(data)
+
+    def reset_input_buffer(self):
+        self._buf.clear()
+
+    def close(self):
+        self._records.close()
@@ -0,0 +1,225 @@
+"""
+Force sensors on independent serial ports.
+
+Each ForceSensor owns its port and lock, so app.py runs one reader thread
+per sensor and a slow or silent port never blocks the others. Frames are
+timestamped on arrival and kept in a short per-sensor window, from which
+SensorManager.update() builds a time-aligned multi-channel sample with
+'sensor:channel' keys (e.g. 'pad2:Fz'). The common instant is the newest
+time every live sensor has reached, so the slowest sensor contributes its
+latest frame and the others are interpolated between the frames around it;
+the snapshot therefore trails the newest frame by up to one frame period.
+
+Each sensor keeps its own status ('initializing', 'ready' or 'error'): a
+sensor whose handshake failed is left out while the others keep running.
+"""
+
+import math
+import struct
+import threading
+import time
+
+CHANNELS = ('Fx', 'Fy', 'Fz', 'F_shear')
+QUIET_S = 0.02 # line idle this long after a reply => command acknowledged
+# idle this long after the stop command => streaming has stopped; longer than
+# one frame period at 12.5 Hz (80 ms) so a gap between frames doesn't count
+STOP_QUIET_S = 0.15
+RECENT_FRAMES = 32 # per-sensor window used for alignment
+STALE_S = 0.5 # a sensor without a frame for this long is left out of the aligned snapshot
+LOCK_TIMEOUT_S = 3.0 # longest init() waits for a reader to let go of the port
+SCAN_BYTES = 64 # bytes searched for a frame header per read_force() call
+
+
+class ForceSensor:
+    def __init__(self, name, port, calibration=None):
+        self.name = name
+        self.port = port
+        self.calibration = calibration # None => use the app-wide factors
+        self.ser = None
+        self.lock = threading.Lock()
+        self.status = 'initializing' # 'ready' once init() succeeded, 'error' if it failed
+        self.error = None
+        # (t, force) tuples, oldest first; replaced, never mutated, on each frame
+        self.recent = ()
+
+    # --- handshake ---
+    def await_reply(self, max_wait, expect_reply=True, quiet=QUIET_S):
+        # Returns as soon as the sensor has answered and the line has gone quiet,
+        # instead of always sleeping max_wait. With expect_reply=False (e.g. after
+        # stopping the stream) it only waits for the line to go quiet.
+        start = time.monotonic()
+        last_rx = None
+        while time.monotonic() - start < max_wait:
+            waiting = self.ser.in_waiting
+            if waiting:
+                self.ser.read(waiting)
+                last_rx = time.monotonic()
+                continue
+            quiet_since = last_rx if last_rx is not None else (None if expect_reply else start)
+            if quiet_since is not None and time.monotonic() - quiet_since >= quiet:
+                return True
+            time.sleep(0.002)
+        return False
+
+    def await_stream_start(self, max_wait):
+        # streaming has started once the first frame byte arrives, leave it for read_force
+        start = time.monotonic()
+        while time.monotonic() - start < max_wait:
+            if self.ser.in_waiting:
+                return True
+            time.sleep(0.002)
+        return False
+
+    def init(self):
+        # the max waits are the fixed sleeps the handshake used to take
+        if not self.lock.acquire(timeout=LOCK_TIMEOUT_S):
+            raise RuntimeError(f'{self.port} busy')
+        try:
+            self.ser.write(b'\x23') # stop streaming
+            self.await_reply(0.5, expect_reply=False, quiet=STOP_QUIET_S)
+            self.ser.write(b'\x26\x01\x62\x65\x72\x6C\x69\x6E')
+            self.await_reply(0.1)
+            self.ser.write(b'\x12\xA6')  # 12.5 Hz
+            self.await_reply(0.1)
+            self.ser.write(b'\x0C\x01')
+            self.await_reply(0.5)
+            self.ser.write(b'\x0C\x02')
+            self.await_reply(0.5)
+            self.ser.write(b'\x0C\x03')
+            self.await_reply(0.5)
+            self.ser.write(b'\x24') # start streaming
+            if not self.await_stream_start(0.5):
+                raise RuntimeError(f'no data from {self.port} after starting the stream')
+        finally:
+            self.lock.release()
+
+    def close(self):
+        self.ser.write(b'\x23') # stopping force sensor data transmission
+        time.sleep(0.5)
+        self.ser.close()
+
+    # --- frames ---
+    def read_force(self, calibration):
+        # Returns None on a read timeout (or SCAN_BYTES without a header) so the
+        # lock is released between attempts: a silent port never blocks init().
+        with self.lock:
+            frame_header = b''
+            for _ in range(SCAN_BYTES): # keep looking until the first byte is xA5
+                frame_header = self.ser.read(1)
+                if frame_header in (b'', b'\xA5'):
+                    break
+            if frame_header != b'\xA5':
+                return None
+            frame = frame_header + self.ser.read(10)
+
+        if len(frame) != 11 or frame[0] != 0xA5 or frame[-2:] != b'\x0D\x0A': # more validation of frame
+            return None
+        fx, fy, fz = struct.unpack('>HHH', frame[1:7])
+        def raw_to_mv_v(raw): return (raw - 32768) / 32768 * 2.0
+        force_vector = {
+            'Fx': round(raw_to_mv_v(fx) * calibration['Fx'], 2),
+            'Fy': round(raw_to_mv_v(fy) * calibration['Fy'], 2),
+            'Fz': round(raw_to_mv_v(fz) * calibration['Fz'], 2),
+        }
+        force_vector['F_shear'] = round(math.sqrt(force_vector['Fx'] ** 2 + force_vector['Fy'] ** 2), 2)
+        return force_vector
+
+    def record(self, t, force):
+        # only called from this sensor's reader thread
+        self.recent = self.recent[-(RECENT_FRAMES - 1):] + ((t, force),)
+
+    def value_at(self, t):
+        """Force at time t, linearly interpolated between the frames around it."""
+        recent = self.recent
+        if not recent:
+            return None
+        if t >= recent[-1][0]:
+            return recent[-1][1] # nothing newer yet, hold the last frame
+        after = None
+        for sample in reversed(recent):
+            if sample[0] <= t:
+                if after is None:
+                    return sample[1]
+                (t0, f0), (t1, f1) = sample, after
+                w = (t - t0) / (t1 - t0) if t1 > t0 else 1.0
+                return {ch: round(f0[ch] + w * (f1[ch] - f0[ch]), 3) for ch in CHANNELS}
+            after = sample
+        return recent[0][1] # older than the window, use the oldest frame we have
+
+    def last_frame_age(self):
+        recent = self.recent
+        return time.time() - recent[-1][0] if recent else None
+
+
+class SensorManager:
+    def __init__(self, config, primary):
+        # config: {name: {'port': ..., 'calibration': {...} (optional)}}
+        self.sensors = {name: ForceSensor(name, cfg['port'], cfg.get('calibration'))
+                        for name, cfg in config.items()}
+        self.primary = self.sensors[primary]
+        # aligned snapshot and its time; replaced (never mutated) by update() only
+        self.channels = {}
+        self.channels_t = 0.0
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return iter(self.sensors.values())
+
+    def __len__(self):
+        return len(self.sensors)
+
+    def init_all(self, sensors=None):
+        """
+        Run the handshake on every sensor (or the given ones) in parallel and
+        set each one's status. Returns {name: error} for those that failed.
+        """
+        errors = {}
+
+        def init(sensor):
+            try:
+                sensor.init()
+            except Exception as e:
+                sensor.status, sensor.error = 'error', str(e)
+                errors[sensor.name] = str(e)
+            else:
+                sensor.status, sensor.error = 'ready', None
+
+        threads = [threading.Thread(target=init, args=(s,)) for s in (self if sensors is None else sensors)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return errors
+
+    def aligned(self, t, sensors=None):
+        """{'sensor:channel': value} for every sensor, interpolated at time t."""
+        out = {}
+        for sensor in sensors or self:
+            force = sensor.value_at(t)
+            if force is None:
+                continue
+            for ch in CHANNELS:
+                out[f'{sensor.name}:{ch}'] = force[ch]
+        return out
+
+    def update(self):
+        """
+        Rebuild `channels` at the newest time every live sensor has reached.
+        Called by each reader after recording a frame; returns True if the
+        snapshot moved forward (an older time never replaces a newer one).
+        """
+        now = time.time()
+        live = [s for s in self if s.recent and now - s.recent[-1][0] <= STALE_S]
+        if not live:
+            return False
+        t = min(s.recent[-1][0] for s in live)
+        with self._lock:
+            if t <= self.channels_t:
+                return False
+            self.channels = self.aligned(t, live)
+            self.channels_t = t
+        return True
+
+    def status(self):
+        return {s.name: {'port': s.port, 'status': s.status, 'error': s.error,
+                         'last_frame_age': s.last_frame_age()} for s in self}
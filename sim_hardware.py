@@ -0,0 +1,85 @@
+"""
+Simulated Raspberry Pi hardware for running app.py off the rig.
+
+install() registers in-memory stand-ins for RPi.GPIO and pyserial in
+sys.modules; call it before importing app. The fake GPIO timestamps every
+rising edge on the registered step pins so harnesses can measure motion.
+"""
+
+import sys
+import threading
+import time
+import types
+
+
+class FakeGPIO(types.ModuleType):
+    BCM = 'BCM'
+    OUT = 'OUT'
+    HIGH = 1
+    LOW = 0
+
+    def __init__(self):
+        super().__init__('RPi.GPIO')
+        self.lock = threading.Lock()
+        self.step_pins = set()
+        self.last_rise = 0.0
+        self.rises = 0
+
+    def setmode(self, mode):
+        pass
+
+    def setup(self, pin, mode, initial=0):
+        pass
+
+    def output(self, pin, value):
+        if value and pin in self.step_pins:
+            with self.lock:
+                self.last_rise = time.perf_counter()
+                self.rises += 1
+
+    def cleanup(self):
+        pass
+
+
+class FakeSerial:
+    """A port with nothing attached: reads time out empty, writes are dropped."""
+
+    in_waiting = 0
+
+    def __init__(self, *args, **kwargs):
+        self.timeout = kwargs.get('timeout', 1)
+
+    def write(self, data):
+        return len(data)
+
+    def read(self, n=1):
+        time.sleep(0.01)
+        return b''
+
+    def reset_input_buffer(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def install():
+    gpio = FakeGPIO()
+    rpi = types.ModuleType('RPi')
+    rpi.GPIO = gpio
+    sys.modules['RPi'] = rpi
+    sys.modules['RPi.GPIO'] = gpio
+    serial_mod = types.ModuleType('serial')
+    serial_mod.Serial = FakeSerial
+    sys.modules['serial'] = serial_mod
+    return gpio
+
+
+def mark_ready(app):
+    """Bring app's hardware state to 'ready' without running the handshake."""
+    app.hardware_state['status'] = 'ready'
+    for sensor in app.sensor_manager:
+        sensor.status = 'ready'
+    app.hardware_ready.set()
+    app.setup_gpio()
+    sys.modules['RPi.GPIO'].step_pins.update(step_pin for step_pin, _ in app.AXES.values())
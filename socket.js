@@ -1,10 +1,16 @@
 import { io } from "https://cdn.socket.io/4.7.5/socket.io.esm.min.js";
-import { pushForce, startPlotting, stopPlotting } from './chartPanel.js';
+import { pushForce, startPlotting, stopPlotting, loadForceHistory } from './chartPanel.js';
 
 const socket = io();
 
+// opt into batched binary telemetry with ?telemetry=binary or localStorage.telemetry = "binary"
+const telemetryFormat = new URLSearchParams(location.search).get("telemetry")
+  ?? localStorage.getItem("telemetry") ?? "json";
+
 socket.on("connect", () => {
   console.log("Connected to backend via WebSocket");
+  loadForceHistory();
+  if (telemetryFormat === "binary") socket.emit("telemetry_format", { format: "binary" });
 });
 
 socket.on("disconnect", () => {
@@ -29,10 +35,10 @@ socket.on("log", (msg) => {
   if (msg.includes("Sequence complete") || msg.includes("manually stopped")) stopPlotting();
 });
 
-socket.on("force", (data) => {
+function handleForce(data, tMs) {
 
   const fz = data.Fz ?? 0;
-  pushForce(fz);
+  pushForce(fz, tMs);
 
   const fzValue = fz.toFixed(2);
   const fzTacho = document.getElementById("fzTacho");
@@ -52,12 +58,109 @@ socket.on("force", (data) => {
   if (fx) fx.textContent = data.Fx?.toFixed(2) ?? "0.00";
   if (fy) fy.textContent = data.Fy?.toFixed(2) ?? "0.00";
   if (fzText) fzText.textContent = fzValue;
-});
+}
 
-socket.on("step_count", (data) => {
+function handleSteps(data) {
   document.getElementById("x-steps").textContent = data.X;
   document.getElementById("y-steps").textContent = data.Y;
   document.getElementById("z-steps").textContent = data.Z;
+}
+
+socket.on("force", (data) => handleForce(data));
+socket.on("step_count", handleSteps);
+
+// binary batches, layout described in telemetry.py / the telemetry_schema event
+let schema = null;
+socket.on("telemetry_schema", (s) => { schema = s; });
+
+socket.on("telemetry", (buf) => {
+  if (!schema) return;
+  const view = new DataView(buf);
+  // magic "GT" and the version announced in telemetry_schema
+  if (view.getUint8(0) !== 0x47 || view.getUint8(1) !== 0x54 || view.getUint8(2) !== schema.version) {
+    console.warn("Ignoring telemetry batch with unknown header");
+    return;
+  }
+  const nForce = view.getUint16(4, true);
+  const nSteps = view.getUint16(6, true);
+  let offset = schema.header.size;
+
+  // sample times are t0 + dt on the server clock; keep their spacing but anchor
+  // the newest one at arrival so a skewed rig clock doesn't shift the plot
+  const lastDt = nForce ? view.getFloat32(offset + (nForce - 1) * schema.force.size, true) : 0;
+  const arrived = Date.now();
+  for (let i = 0; i < nForce; i++) {
+    const dt = view.getFloat32(offset, true);
+    handleForce({
+      Fx: view.getFloat32(offset + 4, true),
+      Fy: view.getFloat32(offset + 8, true),
+      Fz: view.getFloat32(offset + 12, true),
+      F_shear: view.getFloat32(offset + 16, true),
+    }, arrived + (dt - lastDt) * 1000);
+    offset += schema.force.size;
+  }
+  for (let i = 0; i < nSteps; i++) {
+    handleSteps({
+      X: view.getInt32(offset + 4, true),
+      Y: view.getInt32(offset + 8, true),
+      Z: view.getInt32(offset + 12, true),
+    });
+    offset += schema.steps.size;
+  }
+});
+
+// cross-repeat force-vs-displacement mean/std, pushed after every repeat (see repeat_stats.py)
+socket.on("repeat_stats", (stats) => {
+  const c = stats.convergence;
+  console.log(`Repeat ${stats.repeats}/${stats.of}: max SEM ${c.channel} ${c.max_sem ?? "-"} N` +
+    (c.converged ? " (converged)" : ""));
+  window.dispatchEvent(new CustomEvent("repeat-stats", { detail: stats }));
+});
+
+// streaming jog: while a jog control is held its set-point is re-sent every
+// JOG_INTERVAL_MS; the server stops the axes when the stream stops (dead-man)
+const JOG_INTERVAL_MS = 20;
+const jogVelocity = { X: 0, Y: 0, Z: 0 };
+const jogSent = new Map(); // seq -> performance.now() when sent
+let jogSeq = 0;
+let jogTimer = null;
+let jogRtt = null; // last measured round trip, reported back with the next set-point
+
+function sendJog() {
+  const seq = ++jogSeq;
+  jogSent.set(seq, performance.now());
+  if (jogSent.size > 200) jogSent.delete(jogSent.keys().next().value);
+  socket.emit("jog", { seq, v: { ...jogVelocity }, rtt: jogRtt });
+}
+
+// dir: 1, -1 or 0 (release). Returns false when not connected so callers can fall back to /start.
+function jog(axis, dir) {
+  if (!socket.connected) return false;
+  jogVelocity[axis] = dir;
+  sendJog();
+  const active = Object.values(jogVelocity).some((v) => v !== 0);
+  if (active && !jogTimer) jogTimer = setInterval(sendJog, JOG_INTERVAL_MS);
+  if (!active && jogTimer) {
+    clearInterval(jogTimer);
+    jogTimer = null;
+  }
+  return true;
+}
+
+socket.on("jog_ack", (ack) => {
+  const sent = jogSent.get(ack.seq);
+  if (ack.rejected) {
+    console.warn("Jog rejected:", ack.rejected);
+    return;
+  }
+  if (sent === undefined) return;
+  const rtt = performance.now() - sent;
+  if (ack.apply_ms !== undefined) jogRtt = Math.round(rtt * 100) / 100;
+  if (ack.first_step_ms !== undefined) {
+    console.log(`Jog: first step ${rtt.toFixed(1)} ms after press (server ${ack.first_step_ms} ms)`);
+  }
 });
 
-export { socket };
+window.jog = jog;
+
+export { socket, jog };
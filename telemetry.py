@@ -0,0 +1,104 @@
+"""
+Compact binary telemetry for Socket.IO clients.
+
+Clients opt in with a `telemetry_format` event. Instead of one JSON `force`
+dict per sample and one `step_count` dict per motor step, they then receive
+a `telemetry` event every FLUSH_INTERVAL seconds carrying a single binary
+attachment laid out as:
+
+    header  <2sBBHHd   magic b'GT', version, flags, n_force, n_steps, t0
+    force   <fffff     dt, Fx, Fy, Fz, F_shear      (n_force records)
+    steps   <fiii      dt, X, Y, Z                  (n_steps records)
+
+`dt` is seconds since `t0` (epoch seconds) so it fits in float32. The same
+layout is described by SCHEMA, which is sent to a client when it opts in.
+"""
+
+import struct
+import threading
+
+MAGIC = b'GT'
+VERSION = 1
+FLUSH_INTERVAL = 0.05 # seconds, 20 batches per second
+
+HEADER = struct.Struct('<2sBBHHd')
+FORCE_RECORD = struct.Struct('<fffff')
+STEP_RECORD = struct.Struct('<fiii')
+
+FORCE_FIELDS = ('dt', 'Fx', 'Fy', 'Fz', 'F_shear')
+STEP_FIELDS = ('dt', 'X', 'Y', 'Z')
+
+SCHEMA = {
+    'version': VERSION,
+    'endian': 'little',
+    'header': {'format': HEADER.format, 'size': HEADER.size,
+               'fields': ['magic', 'version', 'flags', 'n_force', 'n_steps', 't0']},
+    'force': {'format': FORCE_RECORD.format, 'size': FORCE_RECORD.size, 'fields': list(FORCE_FIELDS)},
+    'steps': {'format': STEP_RECORD.format, 'size': STEP_RECORD.size, 'fields': list(STEP_FIELDS)},
+}
+
+
+def encode_batch(t0, forces, steps):
+    """Pack (t, force_dict) and (t, step_dict) samples into one payload."""
+    buf = bytearray(HEADER.size + FORCE_RECORD.size * len(forces) + STEP_RECORD.size * len(steps))
+    HEADER.pack_into(buf, 0, MAGIC, VERSION, 0, len(forces), len(steps), t0)
+    offset = HEADER.size
+    for t, f in forces:
+        FORCE_RECORD.pack_into(buf, offset, t - t0, f.get('Fx', 0.0), f.get('Fy', 0.0),
+                               f.get('Fz', 0.0), f.get('F_shear', 0.0))
+        offset += FORCE_RECORD.size
+    for t, s in steps:
+        STEP_RECORD.pack_into(buf, offset, t - t0, s['X'], s['Y'], s['Z'])
+        offset += STEP_RECORD.size
+    return bytes(buf)
+
+
+def decode_batch(payload):
+    """Inverse of encode_batch, returns (t0, forces, steps) with absolute times."""
+    magic, version, _, n_force, n_steps, t0 = HEADER.unpack_from(payload, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('not a telemetry batch')
+    offset = HEADER.size
+    forces = []
+    for _ in range(n_force):
+        rec = FORCE_RECORD.unpack_from(payload, offset)
+        forces.append((t0 + rec[0], dict(zip(FORCE_FIELDS[1:], rec[1:]))))
+        offset += FORCE_RECORD.size
+    steps = []
+    for _ in range(n_steps):
+        rec = STEP_RECORD.unpack_from(payload, offset)
+        steps.append((t0 + rec[0], dict(zip(STEP_FIELDS[1:], rec[1:]))))
+        offset += STEP_RECORD.size
+    return t0, forces, steps
+
+
+class TelemetryBatcher:
+    """
+    Collects samples between flushes. Force samples are all kept; step
+    counts are coalesced to the latest value per batch since they change
+    on every motor pulse and clients only display the current count.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._forces = []
+        self._steps = None
+
+    def add_force(self, t, force):
+        with self._lock:
+            self._forces.append((t, dict(force)))
+
+    def add_steps(self, t, counts):
+        with self._lock:
+            self._steps = (t, dict(counts))
+
+    def drain(self):
+        """Return the encoded batch collected so far, or None if empty."""
+        with self._lock:
+            forces, self._forces = self._forces, []
+            steps, self._steps = self._steps, None
+        if not forces and steps is None:
+            return None
+        steps = [steps] if steps is not None else []
+        t0 = forces[0][0] if forces else steps[0][0]
+        return encode_batch(t0, forces, steps)
@@ -5,19 +5,22 @@ without hardware dependencies.
 """
 
 from flask import Flask, request, send_from_directory, jsonify, send_file
-from flask_socketio import SocketIO
+from flask_socketio import SocketIO, join_room, leave_room
 import threading
 import time
 import random
 import json
 import io
 import datetime
+from force_history import ForceHistory, encode_window
+import telemetry
+import repeat_stats
 
 app = Flask(__name__, static_folder='static')
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
 # Mock state that mirrors app.py
-latest_force = {"Fx": 0.0, "Fy": 0.0, "Fz": 0.0}
+latest_force = {"Fx": 0.0, "Fy": 0.0, "Fz": 0.0, "F_shear": 0.0}
 sequence_running = False
 motor_check_done = False
 global_step_counts = {"X": 0, "Y": 0, "Z": 0}
@@ -26,24 +29,43 @@ CALIBRATION_OFFSETS = {'Fx': 0.0, 'Fy': 0.0, 'Fz': 0.0}
 CONFIG_FILE = 'test_config.json'
 logs_buffer = []
 log_f_name = ''
+force_history = ForceHistory(10 * 60 * 10)  # 10 minutes at the mock 10Hz rate
+JSON_ROOM = 'telemetry_json'
+BINARY_ROOM = 'telemetry_binary'
+binary_clients = set()
+telemetry_batcher = telemetry.TelemetryBatcher()
 
 def mock_force_poller():
     """Generate fake force data for testing"""
+    global latest_force
     while True:
         if sequence_running:
             # Generate more dynamic data when sequence is running
-            latest_force["Fx"] = round(random.uniform(-2, 2), 2)
-            latest_force["Fy"] = round(random.uniform(-2, 2), 2) 
-            latest_force["Fz"] = round(random.uniform(0, 8), 2)
+            fx, fy, fz = random.uniform(-2, 2), random.uniform(-2, 2), random.uniform(0, 8)
         else:
             # Generate stable low values when idle
-            latest_force["Fx"] = round(random.uniform(-0.5, 0.5), 2)
-            latest_force["Fy"] = round(random.uniform(-0.5, 0.5), 2)
-            latest_force["Fz"] = round(random.uniform(0, 1), 2)
-        
-        socketio.emit("force", latest_force)
+            fx, fy, fz = random.uniform(-0.5, 0.5), random.uniform(-0.5, 0.5), random.uniform(0, 1)
+
+        # swap in a fresh dict each sample like app.py, never update in place
+        latest_force = {"Fx": round(fx, 2), "Fy": round(fy, 2), "Fz": round(fz, 2),
+                        "F_shear": round((fx ** 2 + fy ** 2) ** 0.5, 2)}
+        now = time.time()
+        force_history.append(now, latest_force)
+        socketio.emit("force", latest_force, to=JSON_ROOM)
+        if binary_clients:
+            telemetry_batcher.add_force(now, latest_force)
         time.sleep(0.1)  # 10Hz update rate
 
+def mock_telemetry_flusher():
+    """Send batched binary telemetry - mirrors app.py"""
+    while True:
+        time.sleep(telemetry.FLUSH_INTERVAL)
+        if not binary_clients:
+            continue
+        payload = telemetry_batcher.drain()
+        if payload:
+            socketio.emit("telemetry", payload, to=BINARY_ROOM)
+
 # Routes
 @app.route('/')
 def index():
@@ -53,10 +75,43 @@ def index():
 def static_files(filename):
     return send_from_directory('static', filename)
 
+@app.route('/health')
+def health():
+    """Hardware readiness - mirrors app.py (mock hardware is always ready)"""
+    return jsonify({'status': 'ready', 'error': None, 'init_seconds': 0.0, 'sequence_running': sequence_running,
+                    'sensors': {'main': {'port': 'mock', 'status': 'ready', 'error': None, 'last_frame_age': 0.0}}})
+
 @app.route('/live_force')
 def live_force():
     return jsonify(latest_force)
 
+@app.route('/repeat_stats')
+def get_repeat_stats():
+    """Cross-repeat statistics - mirrors app.py (the mock never runs repeats)"""
+    return jsonify(dict(repeat_stats.RepeatAggregator().as_dict(), run_id=None))
+
+@app.route('/live_channels')
+def live_channels():
+    """Single mock sensor named 'main' - mirrors app.py"""
+    return jsonify({f'main:{ch}': value for ch, value in latest_force.items()})
+
+@app.route('/force_history')
+def get_force_history():
+    """Downsampled force history - mirrors app.py"""
+    since = request.args.get('since', type=float)
+    max_points = request.args.get('max_points', 2000, type=int)
+    encoding = request.args.get('encoding', 'f32')
+    channels = request.args.get('channels')
+    if channels:
+        channels = channels.split(',')
+        unknown = [ch for ch in channels if ch not in force_history.channels]
+        if unknown:
+            return f"Unknown channels: {', '.join(unknown)}", 400
+    if encoding not in ('f32', 'json') or max_points < 1:
+        return "Invalid query", 400
+    (t, data), decimated = force_history.query(since, max_points, channels or None)
+    return jsonify(encode_window(t, data, decimated, encoding))
+
 @app.route('/run_sequence', methods=['POST'])
 def run_sequence():
     global sequence_running
@@ -102,7 +157,9 @@ def start():
         else:
             global_step_counts[axis] += 1
         
-        socketio.emit("step_count", global_step_counts)
+        socketio.emit("step_count", global_step_counts, to=JSON_ROOM)
+        if binary_clients:
+            telemetry_batcher.add_steps(time.time(), global_step_counts)
     
     return 'OK'
 
@@ -234,37 +291,66 @@ def download_state_json():
         socketio.emit("log", f"Download failed: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@socketio.on("connect")
+def handle_connect():
+    join_room(JSON_ROOM)
+
+@socketio.on("disconnect")
+def handle_disconnect():
+    binary_clients.discard(request.sid)
+
+@socketio.on("telemetry_format")
+def handle_telemetry_format(data):
+    """Switch a client between JSON and binary telemetry - mirrors app.py"""
+    fmt = (data or {}).get("format")
+    if fmt == "binary":
+        leave_room(JSON_ROOM)
+        join_room(BINARY_ROOM)
+        binary_clients.add(request.sid)
+        socketio.emit("telemetry_schema", telemetry.SCHEMA, to=request.sid)
+    elif fmt == "json":
+        leave_room(BINARY_ROOM)
+        join_room(JSON_ROOM)
+        binary_clients.discard(request.sid)
+
+@socketio.on("jog")
+def handle_jog(data):
+    """Streaming jog set-point - mirrors app.py, acks immediately and steps once per held axis"""
+    data = data or {}
+    velocities = data.get("v") or {}
+    for axis in ['X', 'Y', 'Z']:
+        v = velocities.get(axis) or 0
+        if v:
+            global_step_counts[axis] += -1 if v > 0 else 1
+    if any(velocities.values()):
+        socketio.emit("step_count", global_step_counts, to=JSON_ROOM)
+    socketio.emit("jog_ack", {"seq": data.get("seq"), "apply_ms": 0.0}, to=request.sid)
+
 @socketio.on("manual_move")
 def handle_manual_move(data):
-    """Handle manual move requests - mirrors app.py"""
-    global sequence_running
+    """Handle manual move requests - mirrors app.py (one jog set-point, ends after the dead-man)"""
+    data = data or {}
     axis = data.get("axis")
     direction = bool(data.get("direction"))
-    
+
     if axis not in ['X', 'Y', 'Z']:
         socketio.emit("log", f"Invalid axis: {axis}")
         return
-    
+
     if sequence_running:
         socketio.emit("log", "Movement already in progress.")
         return
-    
-    sequence_running = True
+
     direction_str = '+' if direction else '-'
     socketio.emit("log", f"Manual move on {axis} axis ({direction_str})")
-    
-    # Mock manual movement
-    def mock_manual_move():
-        time.sleep(1)  # Simulate movement duration
-        global sequence_running
-        sequence_running = False
-        socketio.emit("log", "Manual move completed.")
-    
-    threading.Thread(target=mock_manual_move, daemon=True).start()
+    # Mock nudge: 250 ms at 500 steps/s
+    global_step_counts[axis] += -125 if direction else 125
+    socketio.emit("step_count", global_step_counts, to=JSON_ROOM)
 
 if __name__ == '__main__':
     # Start mock force poller
     threading.Thread(target=mock_force_poller, daemon=True).start()
+    threading.Thread(target=mock_telemetry_flusher, daemon=True).start()
     
     print("🦎 Mock Gecko Adhesion Laboratory Server Starting...")
     print("📊 Generating fake sensor data for testing")